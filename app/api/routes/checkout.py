@@ -1,7 +1,6 @@
 ﻿import logging
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.functional.main_functions import get_user_data
@@ -11,9 +10,10 @@ from app.functional.main_functions import get_payment, update_payment
 from app.models.errors import PaymentNotFoundError, PaymentAlreadyProcessedError, PaymentExpiredError
 from app.security.crypto import generate_csrf_token
 from app.core.config import CURRENCY_SYMBOL
+from app.core.tracing import TracedTemplates
 
 logger = logging.getLogger(__name__)
-templates = Jinja2Templates(directory="templates/pages")
+templates = TracedTemplates(directory="templates/pages")
 
 router = APIRouter(
     tags=["checkout"],
@@ -32,7 +32,7 @@ async def checkout(payment_id: str, request: Request, db: AsyncSession = Depends
 
     if payment.expires_at < datetime.utcnow():
         payment.status = "expired"
-        await update_payment(db, payment)
+        await update_payment(db, payment, reason="expired_on_checkout")
         raise PaymentExpiredError(payment_id)
 
     user_email = request.cookies.get("user_email")
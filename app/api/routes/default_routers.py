@@ -1,9 +1,9 @@
 ﻿from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from app.core.limiter import limiter
+from app.core.tracing import TracedTemplates
 
-templates = Jinja2Templates(directory="templates/pages")
+templates = TracedTemplates(directory="templates/pages")
 router = APIRouter(tags=["pages"])
 
 @router.get("/", response_class=HTMLResponse)
@@ -0,0 +1,58 @@
+﻿import logging
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.core.session import get_db
+from app.services.export_service import EXPORT_DATASETS, build_export_query, iter_export
+from app.security.admin import require_admin
+from app.core.config import EXPORT_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/export",
+    tags=["export"],
+    dependencies=[Depends(require_admin)],
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+        dataset: str,
+        format: str = Query("csv", pattern="^(csv|ndjson)$"),
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        status: Optional[str] = None,
+        gzip: bool = False,
+        db: AsyncSession = Depends(get_db)
+):
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(404, f"Unknown export dataset: {dataset}")
+
+    try:
+        query = build_export_query(dataset, date_from, date_to, status)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    logger.info(f"Exporting {dataset} as {format} (gzip={gzip}, status={status})")
+
+    filename = f"{dataset}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{format}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        iter_export(db, dataset, query, fmt=format, compress=gzip, chunk_size=EXPORT_CHUNK_SIZE),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
\ No newline at end of file
@@ -1,7 +1,11 @@
-﻿from datetime import datetime
+﻿import asyncio
+from datetime import datetime
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import CURRENCY_CODE
+from app.core.metrics import render_metrics
+from app.services.readiness_service import readiness_probe
 
 router = APIRouter(
     tags=["system"],
@@ -15,4 +19,18 @@ async def health():
         "timestamp": datetime.utcnow().isoformat(),
         "version": "2.0.0",
         "currency": CURRENCY_CODE
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/ready")
+async def ready():
+    report = await readiness_probe.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        await asyncio.to_thread(render_metrics),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
\ No newline at end of file
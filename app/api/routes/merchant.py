@@ -1,10 +1,10 @@
 ﻿from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 from app.core.config import CURRENCY_SYMBOL
+from app.core.tracing import TracedTemplates
 
-templates = Jinja2Templates(directory="templates/pages")
+templates = TracedTemplates(directory="templates/pages")
 
 router = APIRouter(
     prefix="/merchant",
@@ -1,16 +1,18 @@
 ﻿import logging
+import time
 from fastapi import APIRouter, Request, Form, Depends, BackgroundTasks
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.core.session import get_db
 from app.functional.main_functions import get_payment, update_payment
 from app.models.errors import PaymentNotFoundError, InvalidOTPError
 from app.core.config import CURRENCY_SYMBOL
+from app.core.metrics import OTP_VERIFY_SECONDS
+from app.core.tracing import TracedTemplates
 
 logger = logging.getLogger(__name__)
-templates = Jinja2Templates(directory="templates/pages")
+templates = TracedTemplates(directory="templates/pages")
 
 router = APIRouter(
     tags=["pages"],
@@ -42,6 +44,7 @@ async def verify_otp(
     from app.api.routes.payments import finalize_successful_payment
 
     logger.info(f"Verifying OTP for {payment_id}")
+    started = time.perf_counter()
     payment = await get_payment(db, payment_id)
 
     if not payment:
@@ -49,10 +52,12 @@ async def verify_otp(
 
     if not payment.otp_code or payment.otp_code != otp_code:
         logger.warning(f"Invalid OTP for {payment_id}")
+        OTP_VERIFY_SECONDS.observe(time.perf_counter() - started, "invalid")
         raise InvalidOTPError(payment_id)
 
     payment.otp_code = None
-    await finalize_successful_payment(payment, db, background_tasks)
+    await finalize_successful_payment(payment, db, background_tasks, reason="otp_verified")
+    OTP_VERIFY_SECONDS.observe(time.perf_counter() - started, "success")
 
     response = RedirectResponse(url=f"/success/{payment_id}", status_code=303)
     response.set_cookie(
@@ -5,7 +5,6 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, Request, Form, BackgroundTasks, Header
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
@@ -24,7 +23,8 @@ from app.functional.main_functions import (
     create_payment,
     get_payment,
     update_payment,
-    get_payment_by_idempotency
+    get_payment_by_idempotency,
+    get_payment_events
 )
 from app.security.sanitizer import clean_input
 from app.security.crypto import (
@@ -34,11 +34,14 @@ from app.security.crypto import (
     verify_sensitive_data
 )
 from app.services.smtp_service import send_otp_email
+from app.services.batch_writer import payment_event_writer
 from app.core.config import BASE_URL, CURRENCY_SYMBOL
 from app.core.limiter import limiter
+from app.core.metrics import INVOICES_CREATED
+from app.core.tracing import TracedTemplates
 
 logger = logging.getLogger(__name__)
-templates = Jinja2Templates(directory="templates/pages")
+templates = TracedTemplates(directory="templates/pages")
 
 router = APIRouter(
     prefix="/api",
@@ -49,7 +52,8 @@ router = APIRouter(
 async def finalize_successful_payment(
         payment: Payment,
         db: AsyncSession,
-        background_tasks: BackgroundTasks
+        background_tasks: BackgroundTasks,
+        reason: Optional[str] = None
 ):
     from app.models.main_models import SuccessfulOperation
     from app.functional.main_functions import send_successful_operation
@@ -59,7 +63,7 @@ async def finalize_successful_payment(
     logger.info(f"Finalizing payment {payment.id}")
     payment.status = "paid"
     payment.paid_at = datetime.utcnow()
-    await update_payment(db, payment)
+    await update_payment(db, payment, reason)
 
     try:
         new_op = SuccessfulOperation(
@@ -104,12 +108,38 @@ async def create_invoice(invoice: CreateInvoiceRequest, db: AsyncSession = Depen
         expires_at=datetime.utcnow() + timedelta(minutes=15)
     )
 
-    await create_payment(db, payment)
+    await create_payment(db, payment, reason="invoice_created")
+    INVOICES_CREATED.inc()
     page_url = f"{BASE_URL}/checkout/{payment_id}"
     logger.info(f"Invoice created: {payment_id}")
     return CreateInvoiceResponse(pageUrl=page_url)
 
 
+@router.get("/payments/{payment_id}/timeline")
+async def payment_timeline(payment_id: str, db: AsyncSession = Depends(get_db)):
+    payment = await get_payment(db, payment_id)
+
+    if not payment:
+        raise PaymentNotFoundError(payment_id)
+
+    await payment_event_writer.flush()
+    events = await get_payment_events(db, payment_id)
+
+    return {
+        "payment_id": payment.id,
+        "status": payment.status,
+        "events": [
+            {
+                "from_status": event.from_status,
+                "to_status": event.to_status,
+                "reason": event.reason,
+                "timestamp": event.created_at.isoformat()
+            }
+            for event in events
+        ]
+    }
+
+
 @router.post("/pay/{payment_id}")
 @limiter.limit("5/minute")
 async def process_payment(
@@ -201,7 +231,7 @@ async def process_payment(
         cookie_email = request.cookies.get("user_email")
         if cookie_email and cookie_email == email:
             logger.info(f"Cookie matched for {email}, skipping OTP")
-            await finalize_successful_payment(payment, db, background_tasks)
+            await finalize_successful_payment(payment, db, background_tasks, reason="otp_skipped_known_email")
             response = RedirectResponse(url=f"/success/{payment_id}", status_code=303)
             response.set_cookie(
                 key="user_email",
@@ -216,7 +246,7 @@ async def process_payment(
         otp_code = generate_secure_otp()
         payment.otp_code = otp_code
         payment.status = "waiting_for_otp"
-        await update_payment(db, payment)
+        await update_payment(db, payment, reason="otp_sent")
 
         background_tasks.add_task(send_otp_email, email, otp_code)
         logger.info(f"OTP sent to {email}")
@@ -226,5 +256,5 @@ async def process_payment(
         payment.status = "failed"
         payment.error_code = "INSUFFICIENT_FUNDS"
         payment.error_message = "Invalid card or insufficient funds"
-        await update_payment(db, payment)
+        await update_payment(db, payment, reason=payment.error_code)
         raise InsufficientFundsError(payment_id)
\ No newline at end of file
@@ -0,0 +1,31 @@
+﻿import logging
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from app.core.config import PROFILING_SECRET
+from app.core.profiling import request_sweep_profile, secret_matches
+from app.services.background_tasks import SWEEP_NAMES
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/profiling",
+    tags=["profiling"],
+)
+
+
+@router.post("/sweeps/{name}")
+async def profile_next_sweep(name: str, x_profile: Optional[str] = Header(None)):
+    if not PROFILING_SECRET:
+        raise HTTPException(404, "Profiling is disabled")
+
+    if not secret_matches(x_profile):
+        raise HTTPException(401, "Invalid profiling secret")
+
+    if name not in SWEEP_NAMES:
+        raise HTTPException(404, f"Unknown background task: {name}")
+
+    request_sweep_profile(name)
+    logger.info(f"Next {name} iteration will be profiled")
+    return {"task": name, "status": "scheduled"}
@@ -0,0 +1,46 @@
+﻿import logging
+import os
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.core.session import get_db
+from app.services.settlement_service import generate_settlement_file, settlement_paths, summarize_settlement
+from app.security.admin import require_admin
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/settlements",
+    tags=["settlements"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.post("/{day}")
+async def create_settlement(day: date, db: AsyncSession = Depends(get_db)):
+    logger.info(f"Settlement generation requested for {day}")
+    return await generate_settlement_file(db, day)
+
+
+@router.get("/{day}")
+async def get_settlement(day: date):
+    return summarize_settlement(day)
+
+
+@router.get("/{day}/file")
+async def download_settlement(day: date):
+    summary = summarize_settlement(day)
+
+    if summary["status"] != "ready":
+        raise HTTPException(404, f"Settlement file for {day} is not ready")
+
+    path = settlement_paths(day)["file"]
+    return FileResponse(
+        path,
+        media_type="application/gzip",
+        filename=os.path.basename(path),
+        headers={"X-Checksum-SHA256": summary["sha256"]}
+    )
\ No newline at end of file
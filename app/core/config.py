@@ -6,4 +6,33 @@ load_dotenv()
 BASE_URL = os.getenv('BASE_URL', 'http://localhost:8000')
 CURRENCY_CODE = os.getenv('CURRENCY_CODE', 'USD')
 CURRENCY_SYMBOL = os.getenv('CURRENCY_SYMBOL', '$')
-WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', 'default_secret_key_change_in_production')
\ No newline at end of file
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', 'default_secret_key_change_in_production')
+ADMIN_API_KEY = os.getenv('ADMIN_API_KEY')
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '1000'))
+SETTLEMENT_DIR = os.getenv('SETTLEMENT_DIR', 'settlements')
+SETTLEMENT_BATCH_SIZE = int(os.getenv('SETTLEMENT_BATCH_SIZE', '5000'))
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archives')
+WEBHOOK_LOG_RETENTION_DAYS = int(os.getenv('WEBHOOK_LOG_RETENTION_DAYS', '30'))
+WEBHOOK_LOG_PARTITIONING = os.getenv('WEBHOOK_LOG_PARTITIONING', 'false').lower() == 'true'
+RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', '500'))
+RETENTION_BATCH_PAUSE = float(os.getenv('RETENTION_BATCH_PAUSE', '0.1'))
+RETENTION_INTERVAL_SECONDS = int(os.getenv('RETENTION_INTERVAL_SECONDS', '3600'))
+LOG_WRITER_BATCH_SIZE = int(os.getenv('LOG_WRITER_BATCH_SIZE', '500'))
+LOG_WRITER_FLUSH_INTERVAL = float(os.getenv('LOG_WRITER_FLUSH_INTERVAL', '1.0'))
+LOG_WRITER_QUEUE_SIZE = int(os.getenv('LOG_WRITER_QUEUE_SIZE', '10000'))
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_SYNC_INTERVAL = float(os.getenv('METRICS_SYNC_INTERVAL', '5'))
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0'))
+TRACE_EXPORT_PATH = os.getenv('TRACE_EXPORT_PATH', 'traces/spans.jsonl')
+TRACE_OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT')
+TRACE_FLUSH_INTERVAL = float(os.getenv('TRACE_FLUSH_INTERVAL', '5'))
+TRACE_MAX_BUFFER = int(os.getenv('TRACE_MAX_BUFFER', '10000'))
+DEBUG = os.getenv('DEBUG', 'false').lower() == 'true'
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', '10'))
+PROFILING_SECRET = os.getenv('PROFILING_SECRET')
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+LOOP_LAG_SAMPLE_INTERVAL = float(os.getenv('LOOP_LAG_SAMPLE_INTERVAL', '0.5'))
+SLOW_CALLBACK_THRESHOLD = float(os.getenv('SLOW_CALLBACK_THRESHOLD', '0.1'))
+READINESS_CACHE_SECONDS = float(os.getenv('READINESS_CACHE_SECONDS', '5'))
+READINESS_DB_TIMEOUT = float(os.getenv('READINESS_DB_TIMEOUT', '2'))
+READINESS_MAX_WEBHOOK_BACKLOG = int(os.getenv('READINESS_MAX_WEBHOOK_BACKLOG', '1000'))
\ No newline at end of file
@@ -0,0 +1,95 @@
+﻿import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.core.config import LOOP_LAG_SAMPLE_INTERVAL, SLOW_CALLBACK_THRESHOLD
+from app.core.metrics import LOOP_LAG_SECONDS, LOOP_BLOCKED_TOTAL
+
+logger = logging.getLogger(__name__)
+
+
+async def loop_lag_monitor_task(interval: float = LOOP_LAG_SAMPLE_INTERVAL):
+    if interval <= 0:
+        return
+
+    loop = asyncio.get_running_loop()
+    logger.info(f"Sampling event loop lag every {interval}s")
+
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - started - interval))
+
+
+class BlockingCallDetector:
+    """Watchdog thread that logs the loop thread's stack when a callback blocks too long.
+
+    Every check schedules a no-op on the loop and waits ``threshold`` seconds for it to
+    run. If it does not, whatever the loop thread is executing at that moment is the
+    offender, and its stack is logged once per blocking episode.
+    """
+
+    def __init__(self, threshold: float = SLOW_CALLBACK_THRESHOLD, interval: Optional[float] = None):
+        self.threshold = threshold
+        self.interval = interval if interval is not None else threshold
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.threshold <= 0 or self.running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Blocking call detector started (threshold={self.threshold}s)")
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+
+        self._stopped.set()
+        self._thread.join(timeout=self.threshold + self.interval + 1)
+        self._thread = None
+
+    def _loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return "  <loop thread not found>\n"
+        return "".join(traceback.format_stack(frame))
+
+    def _watch(self) -> None:
+        while not self._stopped.is_set():
+            acked = threading.Event()
+            started = time.perf_counter()
+
+            try:
+                self._loop.call_soon_threadsafe(acked.set)
+            except RuntimeError:
+                return
+
+            if not acked.wait(self.threshold):
+                stack = self._loop_stack()
+                LOOP_BLOCKED_TOTAL.inc()
+
+                while not acked.wait(self.threshold) and not self._stopped.is_set():
+                    pass
+
+                logger.warning(
+                    f"Event loop blocked for {time.perf_counter() - started:.3f}s "
+                    f"(threshold {self.threshold}s), loop thread was at:\n{stack}"
+                )
+
+            self._stopped.wait(self.interval)
@@ -0,0 +1,277 @@
+﻿import asyncio
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import METRICS_DIR, METRICS_SYNC_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY: List["Metric"] = []
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+
+    def snapshot(self) -> list:
+        return [[list(labels), value] for labels, value in self._values.items()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Tuple[str, ...] = (),
+            buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def time(self, *labels: str) -> _Timer:
+        return _Timer(self, labels)
+
+
+def collect_snapshot() -> dict:
+    return {metric.name: metric.snapshot() for metric in REGISTRY}
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(METRICS_DIR, f"metrics-{pid}.json")
+
+
+def write_snapshot() -> None:
+    if not METRICS_DIR:
+        return
+
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = _snapshot_path(os.getpid())
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(collect_snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _load_snapshots() -> List[Tuple[dict, bool]]:
+    own_pid = os.getpid()
+    snapshots = [(collect_snapshot(), True)]
+
+    if not METRICS_DIR or not os.path.isdir(METRICS_DIR):
+        return snapshots
+
+    for filename in os.listdir(METRICS_DIR):
+        if not filename.startswith("metrics-") or not filename.endswith(".json"):
+            continue
+
+        pid = int(filename[len("metrics-"):-len(".json")])
+        if pid == own_pid:
+            continue
+
+        try:
+            with open(os.path.join(METRICS_DIR, filename), "r", encoding="utf-8") as f:
+                snapshots.append((json.load(f), _process_alive(pid)))
+        except (OSError, ValueError):
+            continue
+
+    return snapshots
+
+
+def _merge(metric: Metric, snapshots: List[Tuple[dict, bool]]) -> Dict[Tuple[str, ...], object]:
+    merged: Dict[Tuple[str, ...], object] = {}
+
+    for snapshot, alive in snapshots:
+        if metric.type == "gauge" and not alive:
+            continue
+
+        for labels, value in snapshot.get(metric.name, []):
+            key = tuple(labels)
+            if metric.type == "histogram":
+                current = merged.setdefault(key, [[0] * len(value[0]), 0.0])
+                current[0] = [a + b for a, b in zip(current[0], value[0])]
+                current[1] += value[1]
+            else:
+                merged[key] = merged.get(key, 0.0) + value
+
+    return merged
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render_metrics() -> str:
+    snapshots = _load_snapshots()
+    lines = []
+
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+
+        for labels, value in sorted(_merge(metric, snapshots).items()):
+            if metric.type == "histogram":
+                counts, total = value
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f"{metric.name}_bucket{_format_labels(metric.labelnames, labels, ('le', le))} {cumulative}"
+                    )
+                lines.append(f"{metric.name}_sum{_format_labels(metric.labelnames, labels)} {total}")
+                lines.append(f"{metric.name}_count{_format_labels(metric.labelnames, labels)} {cumulative}")
+            else:
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, labels)} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+async def metrics_sync_task():
+    if not METRICS_DIR:
+        return
+
+    logger.info(f"Writing metrics snapshots to {METRICS_DIR}")
+    while True:
+        try:
+            await asyncio.to_thread(write_snapshot)
+        except Exception as e:
+            logger.error(f"Error writing metrics snapshot: {e}")
+
+        await asyncio.sleep(METRICS_SYNC_INTERVAL)
+
+
+INVOICES_CREATED = Counter(
+    "acquiremock_invoices_created_total",
+    "Invoices created through the API"
+)
+PAYMENTS_FINAL = Counter(
+    "acquiremock_payments_final_total",
+    "Payments that reached a final status",
+    ("status",)
+)
+OTP_VERIFY_SECONDS = Histogram(
+    "acquiremock_otp_verify_seconds",
+    "Time spent verifying an OTP submission",
+    ("outcome",)
+)
+WEBHOOK_ATTEMPTS = Counter(
+    "acquiremock_webhook_attempts_total",
+    "Webhook delivery attempts",
+    ("outcome",)
+)
+WEBHOOK_SECONDS = Histogram(
+    "acquiremock_webhook_duration_seconds",
+    "Webhook delivery latency",
+    ("outcome",)
+)
+SMTP_SEND_SECONDS = Histogram(
+    "acquiremock_smtp_send_seconds",
+    "SMTP send latency",
+    ("outcome",)
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "acquiremock_db_pool_checkout_seconds",
+    "Time spent waiting for a database connection",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+BACKGROUND_SWEEP_SECONDS = Histogram(
+    "acquiremock_background_sweep_seconds",
+    "Duration of background sweep iterations",
+    ("task",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "acquiremock_db_queries_per_request",
+    "SQL statements issued while handling a request",
+    ("route",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "acquiremock_db_time_per_request_seconds",
+    "Time spent executing SQL statements while handling a request",
+    ("route",)
+)
+LOOP_LAG_SECONDS = Histogram(
+    "acquiremock_event_loop_lag_seconds",
+    "Delay between when a loop timer was due and when it ran",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+LOOP_BLOCKED_TOTAL = Counter(
+    "acquiremock_event_loop_blocked_total",
+    "Times a single callback blocked the event loop longer than the slow-callback threshold"
+)
@@ -0,0 +1,137 @@
+﻿import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional, Set
+from urllib.parse import parse_qs
+
+from app.core.config import PROFILING_SECRET, PROFILE_DIR
+
+logger = logging.getLogger(__name__)
+
+_active = False
+_requested_sweeps: Set[str] = set()
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", value).strip("_") or "root"
+
+
+class ProfileResult:
+    def __init__(self, label: str, directory: str):
+        self.label = label
+        self.directory = directory
+        self._path = None
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+            self._path = os.path.join(self.directory, f"{timestamp}-{_slug(self.label)}.prof")
+        return self._path
+
+
+def _dump(profiler: cProfile.Profile, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    profiler.dump_stats(path)
+
+
+@asynccontextmanager
+async def profiled(label: str, directory: str = PROFILE_DIR):
+    """Run the enclosed block under cProfile and save the stats to the profile directory.
+
+    cProfile hooks the whole thread, so other tasks running on the loop at the same
+    time show up in the result too. Only one profile is taken at a time; overlapping
+    triggers run unprofiled and get ``None``.
+    """
+    global _active
+
+    if _active:
+        logger.warning(f"Profiling already in progress, skipping {label}")
+        yield None
+        return
+
+    result = ProfileResult(label, directory)
+    profiler = cProfile.Profile()
+    _active = True
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        _active = False
+        await asyncio.to_thread(_dump, profiler, result.path)
+        logger.info(f"Profile for {result.label} saved to {result.path}")
+
+
+def request_sweep_profile(name: str) -> None:
+    _requested_sweeps.add(name)
+
+
+def take_sweep_profile(name: str) -> bool:
+    if name not in _requested_sweeps:
+        return False
+    _requested_sweeps.discard(name)
+    return True
+
+
+def secret_matches(candidate: Optional[str], secret: Optional[str] = PROFILING_SECRET) -> bool:
+    return bool(secret and candidate and hmac.compare_digest(candidate, secret))
+
+
+def _request_label(scope) -> str:
+    route = getattr(scope.get("route"), "path", None) or scope["path"]
+    label = f"{scope['method']}-{_slug(route)}"
+
+    payment_id = scope.get("path_params", {}).get("payment_id")
+    if payment_id:
+        label += f"-{payment_id}"
+    return label
+
+
+class ProfilingMiddleware:
+    """Profile one request when it carries ``X-Profile: <secret>`` or ``?profile=<secret>``.
+
+    Only registered when PROFILING_SECRET is set, so normal deployments never see it.
+    """
+
+    def __init__(self, app, secret: Optional[str] = PROFILING_SECRET, directory: str = PROFILE_DIR):
+        self.app = app
+        self.secret = secret
+        self.directory = directory
+
+    def _triggered(self, scope) -> bool:
+        for key, value in scope["headers"]:
+            if key == b"x-profile":
+                return secret_matches(value.decode("latin-1"), self.secret)
+
+        query = scope.get("query_string", b"")
+        if b"profile=" in query:
+            values = parse_qs(query.decode("latin-1")).get("profile")
+            return bool(values) and secret_matches(values[0], self.secret)
+
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._triggered(scope):
+            await self.app(scope, receive, send)
+            return
+
+        async with profiled(_request_label(scope), self.directory) as result:
+            if result is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    result.label = _request_label(scope)
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-file", os.path.basename(result.path).encode()))
+                    message["headers"] = headers
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
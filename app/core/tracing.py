@@ -0,0 +1,276 @@
+﻿import asyncio
+import functools
+import json
+import logging
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+import httpx
+from fastapi.templating import Jinja2Templates
+
+from app.core.config import (
+    TRACE_SAMPLE_RATE,
+    TRACE_EXPORT_PATH,
+    TRACE_OTLP_ENDPOINT,
+    TRACE_FLUSH_INTERVAL,
+    TRACE_MAX_BUFFER
+)
+
+logger = logging.getLogger(__name__)
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_finished: List["Span"] = []
+
+
+class Span:
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind", "sampled",
+        "attributes", "start_ns", "end_ns", "error", "_token"
+    )
+
+    def __init__(
+            self,
+            name: str,
+            trace_id: str,
+            parent_id: Optional[str],
+            sampled: bool,
+            kind: int = SPAN_KIND_INTERNAL,
+            attributes: Optional[dict] = None
+    ):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.sampled = sampled
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+        self._token = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.error = repr(exc)
+        self.end()
+        _current_span.reset(self._token)
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        if self.sampled and len(_finished) < TRACE_MAX_BUFFER:
+            _finished.append(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    traceparent = None
+    attributes: dict = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def parse_traceparent(header: Optional[str]):
+    if not header:
+        return None
+
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+
+    return parts[1], parts[2], parts[3] == "01"
+
+
+def root_span(name: str, traceparent: Optional[str] = None, kind: int = SPAN_KIND_INTERNAL, attributes=None) -> Span:
+    parent = parse_traceparent(traceparent)
+
+    if parent:
+        trace_id, parent_id, sampled = parent
+        sampled = TRACE_SAMPLE_RATE > 0 and (sampled or random.random() < TRACE_SAMPLE_RATE)
+    else:
+        trace_id = f"{random.getrandbits(128):032x}"
+        parent_id = None
+        sampled = TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE
+
+    return Span(name, trace_id, parent_id, sampled, kind, attributes)
+
+
+def start_span(name: str, attributes: Optional[dict] = None, kind: int = SPAN_KIND_INTERNAL):
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+
+    if not parent.sampled and kind != SPAN_KIND_CLIENT:
+        return NOOP_SPAN
+
+    return Span(name, parent.trace_id, parent.span_id, parent.sampled, kind, attributes)
+
+
+def traced(name: str):
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                parent = _current_span.get()
+                if parent is None or not parent.sampled:
+                    return await fn(*args, **kwargs)
+                with Span(name, parent.trace_id, parent.span_id, True):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def sync_wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None or not parent.sampled:
+                return fn(*args, **kwargs)
+            with Span(name, parent.trace_id, parent.span_id, True):
+                return fn(*args, **kwargs)
+        return sync_wrapper
+
+    return decorator
+
+
+class TracedTemplates(Jinja2Templates):
+    def TemplateResponse(self, *args, **kwargs):
+        if args and isinstance(args[0], str):
+            template_name = args[0]
+        elif len(args) > 1:
+            template_name = args[1]
+        else:
+            template_name = kwargs.get("name")
+
+        with start_span("template.render", {"template": template_name}):
+            return super().TemplateResponse(*args, **kwargs)
+
+
+class TracingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        span = root_span(
+            f"{scope['method']} {scope['path']}",
+            traceparent,
+            kind=SPAN_KIND_SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]}
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+            await send(message)
+
+        with span:
+            await self.app(scope, receive, send_wrapper)
+
+
+def _drain() -> List[Span]:
+    spans = _finished[:]
+    del _finished[:len(spans)]
+    return spans
+
+
+def _otlp_payload(spans: List[Span]) -> dict:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": "acquiremock"}},
+                {"key": "process.pid", "value": {"stringValue": str(os.getpid())}},
+            ]},
+            "scopeSpans": [{
+                "scope": {"name": "acquiremock"},
+                "spans": [span.to_otlp() for span in spans],
+            }],
+        }]
+    }
+
+
+def _write_file(payload: dict) -> None:
+    directory = os.path.dirname(TRACE_EXPORT_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(TRACE_EXPORT_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps(payload) + "\n")
+
+
+async def flush_spans() -> int:
+    spans = _drain()
+    if not spans:
+        return 0
+
+    payload = _otlp_payload(spans)
+
+    if TRACE_EXPORT_PATH:
+        await asyncio.to_thread(_write_file, payload)
+
+    if TRACE_OTLP_ENDPOINT:
+        async with httpx.AsyncClient(timeout=5) as client:
+            await client.post(f"{TRACE_OTLP_ENDPOINT.rstrip('/')}/v1/traces", json=payload)
+
+    return len(spans)
+
+
+async def tracing_export_task():
+    if TRACE_SAMPLE_RATE <= 0:
+        return
+
+    logger.info(f"Exporting sampled traces (rate={TRACE_SAMPLE_RATE})")
+    while True:
+        await asyncio.sleep(TRACE_FLUSH_INTERVAL)
+        try:
+            await flush_spans()
+        except Exception as e:
+            logger.error(f"Error exporting traces: {e}")
\ No newline at end of file
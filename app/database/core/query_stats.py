@@ -0,0 +1,110 @@
+﻿import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import DEBUG, N_PLUS_ONE_THRESHOLD
+from app.core.metrics import DB_QUERIES_PER_REQUEST, DB_TIME_PER_REQUEST
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    __slots__ = ("count", "duration", "statements", "parent")
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Dict[str, int] = {}
+        self.parent = parent
+
+    def record(self, statement: str, duration: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        return {statement: count for statement, count in self.statements.items() if count >= threshold}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+
+    stats.record(statement, time.perf_counter() - started.pop())
+
+
+@contextmanager
+def count_queries():
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget: int):
+    with count_queries() as stats:
+        yield stats
+
+    if stats.count > budget:
+        statements = "\n".join(f"  {count}x {statement}" for statement, count in stats.statements.items())
+        raise AssertionError(f"Expected at most {budget} queries, got {stats.count}:\n{statements}")
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(parent=_current_stats.get())
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if DEBUG and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.duration * 1000:.2f}".encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            DB_QUERIES_PER_REQUEST.observe(stats.count, route_path)
+            DB_TIME_PER_REQUEST.observe(stats.duration, route_path)
+
+            for statement, count in stats.repeated().items():
+                logger.warning(
+                    f"Possible N+1 on {scope['method']} {route_path}: "
+                    f"statement executed {count} times: {statement}"
+                )
\ No newline at end of file
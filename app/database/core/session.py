@@ -2,6 +2,9 @@
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 import os
+import time
+
+from app.core.metrics import DB_POOL_CHECKOUT_SECONDS
 
 load_dotenv()
 
@@ -25,4 +28,7 @@ AsyncSessionLocal = sessionmaker(
 
 async def get_db():
     async with AsyncSessionLocal() as session:
+        started = time.perf_counter()
+        await session.connection()
+        DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
         yield session
\ No newline at end of file
@@ -1,9 +1,15 @@
-﻿from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.main_models import SuccessfulOperation, Payment, WebhookLog
+﻿from sqlalchemy import column, delete, func, inspect, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.main_models import SuccessfulOperation, Payment, WebhookLog, PaymentEvent
+from app.core.config import WEBHOOK_LOG_PARTITIONING
+from app.services.batch_writer import webhook_log_writer, payment_event_writer
+from app.core.metrics import PAYMENTS_FINAL
+from app.core.tracing import traced
 from sqlmodel import SQLModel, select
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional, Tuple
 
+@traced("db.send_successful_operation")
 async def send_successful_operation(session: AsyncSession, operation: SuccessfulOperation):
     session.add(operation)
     await session.commit()
@@ -12,33 +18,75 @@ async def send_successful_operation(session: AsyncSession, operation: Successful
 
 async def init_db(engine):
     async with engine.begin() as conn:
+        if WEBHOOK_LOG_PARTITIONING and conn.dialect.name == "postgresql":
+            await create_partitioned_webhook_logs(conn)
         await conn.run_sync(SQLModel.metadata.create_all)
 
-async def create_payment(session: AsyncSession, payment: Payment) -> Payment:
+FINAL_STATUSES = {"paid", "failed", "expired", "refunded"}
+
+
+def record_payment_event(
+        session: AsyncSession,
+        payment: Payment,
+        from_status: Optional[str],
+        reason: Optional[str] = None
+) -> None:
+    event = PaymentEvent(
+        payment_id=payment.id,
+        from_status=from_status,
+        to_status=payment.status,
+        reason=reason
+    )
+
+    if payment.status in FINAL_STATUSES:
+        PAYMENTS_FINAL.inc(payment.status)
+
+    if not payment_event_writer.submit(event):
+        session.add(event)
+
+
+def _previous_status(payment: Payment) -> Optional[str]:
+    history = inspect(payment).attrs.status.history
+    if not history.added:
+        return payment.status
+    return history.deleted[0] if history.deleted else None
+
+
+@traced("db.create_payment")
+async def create_payment(session: AsyncSession, payment: Payment, reason: Optional[str] = None) -> Payment:
+    record_payment_event(session, payment, None, reason)
     session.add(payment)
     await session.commit()
     await session.refresh(payment)
     return payment
 
+@traced("db.get_payment")
 async def get_payment(session: AsyncSession, payment_id: str) -> Optional[Payment]:
     result = await session.execute(
         select(Payment).where(Payment.id == payment_id)
     )
     return result.scalars().first()
 
-async def update_payment(session: AsyncSession, payment: Payment) -> Payment:
+@traced("db.update_payment")
+async def update_payment(session: AsyncSession, payment: Payment, reason: Optional[str] = None) -> Payment:
+    previous_status = _previous_status(payment)
+    if previous_status != payment.status:
+        record_payment_event(session, payment, previous_status, reason)
+
     payment.updated_at = datetime.utcnow()
     session.add(payment)
     await session.commit()
     await session.refresh(payment)
     return payment
 
+@traced("db.get_payment_by_idempotency")
 async def get_payment_by_idempotency(session: AsyncSession, idempotency_key: str) -> Optional[Payment]:
     result = await session.execute(
         select(Payment).where(Payment.idempotency_key == idempotency_key)
     )
     return result.scalars().first()
 
+@traced("db.get_expired_payments")
 async def get_expired_payments(session: AsyncSession):
     now = datetime.utcnow()
     result = await session.execute(
@@ -49,12 +97,17 @@ async def get_expired_payments(session: AsyncSession):
     )
     return result.scalars().all()
 
+@traced("db.log_webhook")
 async def log_webhook(session: AsyncSession, log: WebhookLog):
+    if webhook_log_writer.submit(log):
+        return log
+
     session.add(log)
     await session.commit()
     await session.refresh(log)
     return log
 
+@traced("db.get_failed_webhooks")
 async def get_failed_webhooks(session: AsyncSession, max_attempts: int = 5):
     result = await session.execute(
         select(Payment).where(
@@ -65,6 +118,28 @@ async def get_failed_webhooks(session: AsyncSession, max_attempts: int = 5):
     )
     return result.scalars().all()
 
+@traced("db.count_expired_payments")
+async def count_expired_payments(session: AsyncSession) -> int:
+    result = await session.execute(
+        select(func.count()).select_from(Payment).where(
+            Payment.status == "pending",
+            Payment.expires_at < datetime.utcnow()
+        )
+    )
+    return result.scalar_one()
+
+@traced("db.count_failed_webhooks")
+async def count_failed_webhooks(session: AsyncSession, max_attempts: int = 5) -> int:
+    result = await session.execute(
+        select(func.count()).select_from(Payment).where(
+            Payment.webhook_attempts < max_attempts,
+            Payment.webhook_status == "failed",
+            Payment.status == "paid"
+        )
+    )
+    return result.scalar_one()
+
+@traced("db.get_user_data")
 async def get_user_data(email: str, db: AsyncSession):
     from app.models.main_models import SuccessfulOperation, SavedCard
     from sqlmodel import select
@@ -84,3 +159,144 @@ async def get_user_data(email: str, db: AsyncSession):
 
     return op_result.scalars().all(), card_result.scalars().all()
 
+async def stream_rows(session: AsyncSession, statement, chunk_size: int = 1000):
+    result = await session.stream(statement.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions():
+        yield partition
+
+async def get_settlement_batch(
+        session: AsyncSession,
+        day_start: datetime,
+        day_end: datetime,
+        after_id: int,
+        limit: int
+):
+    result = await session.execute(
+        select(
+            SuccessfulOperation.id,
+            SuccessfulOperation.payment_id,
+            SuccessfulOperation.reference,
+            SuccessfulOperation.amount,
+            SuccessfulOperation.card_mask,
+            SuccessfulOperation.created_at,
+            Payment.status
+        )
+        .join(Payment, Payment.id == SuccessfulOperation.payment_id, isouter=True)
+        .where(
+            SuccessfulOperation.created_at >= day_start,
+            SuccessfulOperation.created_at < day_end,
+            SuccessfulOperation.id > after_id
+        )
+        .order_by(SuccessfulOperation.id)
+        .limit(limit)
+    )
+    return result.all()
+
+WEBHOOK_LOG_COLUMNS = [c.name for c in WebhookLog.__table__.columns]
+
+
+async def get_webhook_log_batch(
+        session: AsyncSession,
+        cutoff: Optional[datetime],
+        after_id: int,
+        limit: int,
+        source: str = "webhook_logs"
+):
+    source_table = table(source, *[column(name) for name in WEBHOOK_LOG_COLUMNS])
+    query = select(*source_table.columns).where(source_table.c.id > after_id)
+    if cutoff:
+        query = query.where(source_table.c.created_at < cutoff)
+
+    result = await session.execute(query.order_by(source_table.c.id).limit(limit))
+    return result.mappings().all()
+
+
+async def delete_webhook_logs(session: AsyncSession, ids: List[int]) -> None:
+    await session.execute(delete(WebhookLog).where(WebhookLog.id.in_(ids)))
+    await session.commit()
+
+
+async def create_partitioned_webhook_logs(conn) -> None:
+    await conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS webhook_logs (
+            id SERIAL,
+            payment_id VARCHAR NOT NULL,
+            webhook_url VARCHAR NOT NULL,
+            payload VARCHAR NOT NULL,
+            response_status INTEGER,
+            response_body VARCHAR,
+            signature VARCHAR NOT NULL,
+            attempt_number INTEGER NOT NULL,
+            success BOOLEAN NOT NULL,
+            error_message VARCHAR,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_webhook_logs_payment_id ON webhook_logs (payment_id)"
+    ))
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS webhook_logs_default PARTITION OF webhook_logs DEFAULT"
+    ))
+
+    this_month = datetime.utcnow().date().replace(day=1)
+    next_month = date(this_month.year + this_month.month // 12, this_month.month % 12 + 1, 1)
+    for month in (this_month, next_month):
+        await conn.execute(text(webhook_log_partition_ddl(month)))
+
+
+async def is_webhook_logs_partitioned(session: AsyncSession) -> bool:
+    if session.bind.dialect.name != "postgresql":
+        return False
+
+    result = await session.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('webhook_logs')"
+    ))
+    return result.first() is not None
+
+
+async def list_webhook_log_partitions(session: AsyncSession) -> List[Tuple[str, date]]:
+    result = await session.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass('webhook_logs')
+    """))
+
+    partitions = []
+    for (name,) in result.all():
+        suffix = name.rsplit("_p", 1)[-1]
+        if name.startswith("webhook_logs_p") and suffix.isdigit() and len(suffix) == 6:
+            partitions.append((name, date(int(suffix[:4]), int(suffix[4:]), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def webhook_log_partition_ddl(month: date) -> str:
+    start = month.replace(day=1)
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS webhook_logs_p{start.strftime('%Y%m')} PARTITION OF webhook_logs "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+async def ensure_webhook_log_partition(session: AsyncSession, month: date) -> None:
+    await session.execute(text(webhook_log_partition_ddl(month)))
+    await session.commit()
+
+
+async def drop_webhook_log_partition(session: AsyncSession, name: str) -> None:
+    await session.execute(text(f"ALTER TABLE webhook_logs DETACH PARTITION {name}"))
+    await session.execute(text(f"DROP TABLE {name}"))
+    await session.commit()
+
+
+@traced("db.get_payment_events")
+async def get_payment_events(session: AsyncSession, payment_id: str):
+    result = await session.execute(
+        select(PaymentEvent)
+        .where(PaymentEvent.payment_id == payment_id)
+        .order_by(PaymentEvent.created_at, PaymentEvent.id)
+    )
+    return result.scalars().all()
@@ -12,9 +12,17 @@ from slowapi.errors import RateLimitExceeded
 from app.database.core.session import engine
 from app.functional.main_functions import init_db
 from app.services.background_tasks import start_background_tasks
+from app.services.batch_writer import webhook_log_writer, payment_event_writer
+from app.core.metrics import metrics_sync_task, write_snapshot
+from app.core.tracing import tracing_export_task, flush_spans
+from app.core.loop_monitor import loop_lag_monitor_task, BlockingCallDetector
 from app.models.errors import PaymentError
 from app.core.limiter import limiter
 from app.security.middleware import SecurityHeadersMiddleware
+from app.core.tracing import TracingMiddleware
+from app.database.core.query_stats import QueryStatsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.config import PROFILING_SECRET
 
 from app.api.routes import (
     auth,
@@ -25,7 +33,10 @@ from app.api.routes import (
     health,
     default_routers,
     merchant,
-    checkout
+    checkout,
+    exports,
+    settlements,
+    profiling
 )
 
 logging.basicConfig(
@@ -43,6 +54,14 @@ async def lifespan(app: FastAPI):
     await init_db(engine)
     logger.info("Database initialized successfully.")
 
+    webhook_log_writer.start()
+    payment_event_writer.start()
+    metrics_task = asyncio.create_task(metrics_sync_task())
+    tracing_task = asyncio.create_task(tracing_export_task())
+    loop_lag_task = asyncio.create_task(loop_lag_monitor_task())
+    blocking_detector = BlockingCallDetector()
+    blocking_detector.start()
+
     if not TESTING:
         asyncio.create_task(start_background_tasks())
         logger.info("Background tasks started")
@@ -52,6 +71,19 @@ async def lifespan(app: FastAPI):
     yield
     logger.info("Shutting down application...")
 
+    await webhook_log_writer.stop()
+    await payment_event_writer.stop()
+    logger.info("Pending webhook logs and payment events flushed")
+
+    metrics_task.cancel()
+    write_snapshot()
+
+    tracing_task.cancel()
+    await flush_spans()
+
+    loop_lag_task.cancel()
+    blocking_detector.stop()
+
 
 app = FastAPI(
     title="AcquireMock",
@@ -60,6 +92,10 @@ app = FastAPI(
 )
 
 app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(TracingMiddleware)
+if PROFILING_SECRET:
+    app.add_middleware(ProfilingMiddleware)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -95,6 +131,9 @@ app.include_router(webhooks.router)
 app.include_router(user.router)
 app.include_router(merchant.router)
 app.include_router(checkout.router)
+app.include_router(exports.router)
+app.include_router(settlements.router)
+app.include_router(profiling.router)
 
 if __name__ == "__main__":
     import uvicorn
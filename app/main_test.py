@@ -14,6 +14,10 @@ from slowapi.errors import RateLimitExceeded
 from app.models.errors import PaymentError
 from app.core.limiter import limiter
 from app.security.middleware import SecurityHeadersMiddleware
+from app.core.tracing import TracingMiddleware
+from app.database.core.query_stats import QueryStatsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.config import PROFILING_SECRET
 
 from app.api.routes import (
     auth,
@@ -24,7 +28,10 @@ from app.api.routes import (
     health,
     default_routers,
     merchant,
-    checkout
+    checkout,
+    exports,
+    settlements,
+    profiling
 )
 
 logging.basicConfig(
@@ -39,6 +46,10 @@ app = FastAPI(
 )
 
 app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(TracingMiddleware)
+if PROFILING_SECRET:
+    app.add_middleware(ProfilingMiddleware)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -81,5 +92,8 @@ app.include_router(webhooks.router)
 app.include_router(user.router)
 app.include_router(merchant.router)
 app.include_router(checkout.router)
+app.include_router(exports.router)
+app.include_router(settlements.router)
+app.include_router(profiling.router)
 
 logger.info("Test application initialized (no background tasks)")
\ No newline at end of file
@@ -73,4 +73,14 @@ class WebhookLog(SQLModel, table=True):
     attempt_number: int
     success: bool = Field(default=False)
     error_message: Optional[str] = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PaymentEvent(SQLModel, table=True):
+    __tablename__ = "payment_events"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    payment_id: str = Field(index=True)
+    from_status: Optional[str] = Field(default=None)
+    to_status: str
+    reason: Optional[str] = Field(default=None)
     created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
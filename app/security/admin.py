@@ -0,0 +1,14 @@
+﻿import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.config import ADMIN_API_KEY
+
+
+async def require_admin(x_admin_key: Optional[str] = Header(None)):
+    if not ADMIN_API_KEY:
+        return
+
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(401, "Invalid admin key")
\ No newline at end of file
@@ -1,63 +1,118 @@
 ﻿import asyncio
 import logging
+import time
+from datetime import datetime, timedelta
 from app.functional.main_functions import get_expired_payments, update_payment, get_failed_webhooks
 from app.database.core.session import AsyncSessionLocal
 from app.services.webhook_service import send_webhook_with_retry
+from app.services.settlement_service import generate_settlement_file, summarize_settlement
+from app.services.retention_service import apply_webhook_log_retention
+from app.core.config import RETENTION_INTERVAL_SECONDS
+from app.core.metrics import BACKGROUND_SWEEP_SECONDS
+from app.core.tracing import root_span
+from app.core.profiling import profiled, take_sweep_profile
 
 logger = logging.getLogger(__name__)
 
+sweep_heartbeats = {}
 
-async def expire_pending_payments_task():
-    logger.info("Starting payment expiration background task")
 
-    while True:
-        try:
-            async with AsyncSessionLocal() as session:
-                expired_payments = await get_expired_payments(session)
+async def expire_pending_payments():
+    async with AsyncSessionLocal() as session:
+        expired_payments = await get_expired_payments(session)
 
-                for payment in expired_payments:
-                    logger.info(f"Expiring payment {payment.id}")
-                    payment.status = "expired"
-                    await update_payment(session, payment)
+        for payment in expired_payments:
+            logger.info(f"Expiring payment {payment.id}")
+            payment.status = "expired"
+            await update_payment(session, payment, reason="expiry_sweep")
 
-                if expired_payments:
-                    logger.info(f"Expired {len(expired_payments)} payments")
+        if expired_payments:
+            logger.info(f"Expired {len(expired_payments)} payments")
 
-        except Exception as e:
-            logger.error(f"Error in payment expiration task: {e}")
 
-        await asyncio.sleep(60)
+async def retry_failed_webhooks():
+    async with AsyncSessionLocal() as session:
+        failed_payments = await get_failed_webhooks(session, max_attempts=5)
 
+        for payment in failed_payments:
+            logger.info(f"Retrying webhook for payment {payment.id}, attempt {payment.webhook_attempts + 1}")
+
+            await asyncio.sleep(2 ** payment.webhook_attempts)
+
+            success = await send_webhook_with_retry(payment, session)
+
+            if success:
+                logger.info(f"Webhook retry successful for payment {payment.id}")
+            else:
+                logger.warning(f"Webhook retry failed for payment {payment.id}")
+
+
+async def generate_daily_settlement():
+    day = (datetime.utcnow() - timedelta(days=1)).date()
+
+    if summarize_settlement(day)["status"] != "ready":
+        async with AsyncSessionLocal() as session:
+            await generate_settlement_file(session, day)
+
+
+async def apply_retention():
+    async with AsyncSessionLocal() as session:
+        await apply_webhook_log_retention(session)
 
-async def retry_failed_webhooks_task():
-    logger.info("Starting webhook retry background task")
+
+async def _run_periodically(name: str, sweep, interval: float):
+    logger.info(f"Starting {name} background task")
+    heartbeat = sweep_heartbeats[name] = {
+        "interval": interval,
+        "last_started": None,
+        "last_finished": None,
+        "last_error": None
+    }
 
     while True:
+        heartbeat["last_started"] = time.time()
         try:
-            async with AsyncSessionLocal() as session:
-                failed_payments = await get_failed_webhooks(session, max_attempts=5)
+            with BACKGROUND_SWEEP_SECONDS.time(name), root_span(f"sweep.{name}"):
+                if take_sweep_profile(name):
+                    async with profiled(f"sweep-{name}"):
+                        await sweep()
+                else:
+                    await sweep()
+            heartbeat["last_error"] = None
 
-                for payment in failed_payments:
-                    logger.info(f"Retrying webhook for payment {payment.id}, attempt {payment.webhook_attempts + 1}")
+        except Exception as e:
+            logger.error(f"Error in {name} task: {e}")
+            heartbeat["last_error"] = str(e)
 
-                    await asyncio.sleep(2 ** payment.webhook_attempts)
+        heartbeat["last_finished"] = time.time()
 
-                    success = await send_webhook_with_retry(payment, session)
+        await asyncio.sleep(interval)
 
-                    if success:
-                        logger.info(f"Webhook retry successful for payment {payment.id}")
-                    else:
-                        logger.warning(f"Webhook retry failed for payment {payment.id}")
 
-        except Exception as e:
-            logger.error(f"Error in webhook retry task: {e}")
+SWEEP_NAMES = ("payment_expiration", "webhook_retry", "daily_settlement", "webhook_log_retention")
+
+
+async def expire_pending_payments_task():
+    await _run_periodically("payment_expiration", expire_pending_payments, 60)
+
+
+async def retry_failed_webhooks_task():
+    await _run_periodically("webhook_retry", retry_failed_webhooks, 300)
+
+
+async def generate_daily_settlement_task():
+    await _run_periodically("daily_settlement", generate_daily_settlement, 3600)
+
 
-        await asyncio.sleep(300)
+async def webhook_log_retention_task():
+    await _run_periodically("webhook_log_retention", apply_retention, RETENTION_INTERVAL_SECONDS)
 
 
 async def start_background_tasks():
     tasks = [
         asyncio.create_task(expire_pending_payments_task()),
-        asyncio.create_task(retry_failed_webhooks_task())
+        asyncio.create_task(retry_failed_webhooks_task()),
+        asyncio.create_task(generate_daily_settlement_task()),
+        asyncio.create_task(webhook_log_retention_task())
     ]
     await asyncio.gather(*tasks)
\ No newline at end of file
@@ -0,0 +1,147 @@
+﻿import asyncio
+import logging
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlmodel import SQLModel
+
+from app.database.core.session import AsyncSessionLocal
+from app.models.main_models import PaymentEvent, WebhookLog
+from app.core.config import LOG_WRITER_BATCH_SIZE, LOG_WRITER_FLUSH_INTERVAL, LOG_WRITER_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class _Marker:
+    def __init__(self, future: asyncio.Future, stop: bool = False):
+        self.future = future
+        self.stop = stop
+
+
+class BatchWriter:
+    def __init__(
+            self,
+            model,
+            batch_size: int = LOG_WRITER_BATCH_SIZE,
+            flush_interval: float = LOG_WRITER_FLUSH_INTERVAL,
+            queue_size: int = LOG_WRITER_QUEUE_SIZE,
+            session_factory=AsyncSessionLocal
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Batch writer for {self.model.__tablename__} started")
+
+    def submit(self, record: SQLModel) -> bool:
+        if not self.running:
+            return False
+
+        try:
+            self._queue.put_nowait(record.model_dump(exclude={"id"}))
+        except asyncio.QueueFull:
+            logger.warning(f"Batch writer queue for {self.model.__tablename__} is full")
+            return False
+
+        return True
+
+    async def flush(self) -> None:
+        if not self.running:
+            return
+
+        marker = _Marker(asyncio.get_running_loop().create_future())
+        await self._queue.put(marker)
+        await marker.future
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+
+        marker = _Marker(asyncio.get_running_loop().create_future(), stop=True)
+        await self._queue.put(marker)
+        await self._task
+        self._task = None
+
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if isinstance(item, _Marker):
+                item.future.set_result(None)
+            else:
+                leftover.append(item)
+        await self._write(leftover)
+        logger.info(f"Batch writer for {self.model.__tablename__} stopped")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            item = await self._queue.get()
+            deadline = loop.time() + self.flush_interval
+            batch: List[dict] = []
+            marker = None
+
+            while True:
+                if isinstance(item, _Marker):
+                    marker = item
+                    break
+
+                batch.append(item)
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._write(batch)
+            except Exception as e:
+                logger.error(f"Batch writer for {self.model.__tablename__} lost {len(batch)} rows: {e}")
+
+            if marker:
+                marker.future.set_result(None)
+                if marker.stop:
+                    return
+
+    async def _write(self, batch: List[dict]) -> None:
+        if not batch:
+            return
+
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(self.model), batch)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Batch insert into {self.model.__tablename__} failed, retrying row by row: {e}")
+            await self._write_rows(batch)
+
+    async def _write_rows(self, batch: List[dict]) -> None:
+        async with self.session_factory() as session:
+            for row in batch:
+                try:
+                    await session.execute(insert(self.model), [row])
+                    await session.commit()
+                except Exception as e:
+                    await session.rollback()
+                    logger.error(f"Dropping {self.model.__tablename__} row after insert failure: {e}")
+
+
+webhook_log_writer = BatchWriter(WebhookLog)
+payment_event_writer = BatchWriter(PaymentEvent)
\ No newline at end of file
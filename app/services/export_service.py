@@ -0,0 +1,117 @@
+﻿import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.functional.main_functions import stream_rows
+from app.models.main_models import Payment, SuccessfulOperation, WebhookLog
+
+FLUSH_THRESHOLD = 64 * 1024
+
+EXPORT_DATASETS = {
+    "payments": {
+        "model": Payment,
+        "columns": [
+            "id", "amount", "reference", "status", "card_mask", "otp_email",
+            "error_code", "webhook_status", "webhook_attempts",
+            "created_at", "updated_at", "paid_at", "expires_at"
+        ],
+    },
+    "operations": {
+        "model": SuccessfulOperation,
+        "columns": ["id", "payment_id", "email", "amount", "reference", "card_mask", "created_at"],
+    },
+    "webhook-logs": {
+        "model": WebhookLog,
+        "columns": [
+            "id", "payment_id", "webhook_url", "attempt_number", "success",
+            "response_status", "error_message", "signature", "payload", "created_at"
+        ],
+    },
+}
+
+
+def build_export_query(
+        dataset: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        status: Optional[str] = None
+):
+    spec = EXPORT_DATASETS[dataset]
+    model = spec["model"]
+
+    query = select(*[getattr(model, name) for name in spec["columns"]])
+
+    if date_from:
+        query = query.where(model.created_at >= date_from)
+    if date_to:
+        query = query.where(model.created_at < date_to)
+
+    if status:
+        if model is Payment:
+            query = query.where(Payment.status == status)
+        elif model is WebhookLog:
+            query = query.where(WebhookLog.success == (status == "success"))
+        else:
+            raise ValueError(f"Status filter is not supported for {dataset}")
+
+    return query.order_by(model.created_at, model.id)
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(columns: Sequence[str], rows: Iterable, buffer: io.StringIO, writer) -> None:
+    for row in rows:
+        writer.writerow([_plain(value) for value in row])
+
+
+def _encode_ndjson(columns: Sequence[str], rows: Iterable, buffer: io.StringIO, writer) -> None:
+    for row in rows:
+        buffer.write(json.dumps(dict(zip(columns, (_plain(value) for value in row))), default=str))
+        buffer.write("\n")
+
+
+async def iter_export(
+        session: AsyncSession,
+        dataset: str,
+        query,
+        fmt: str = "csv",
+        compress: bool = False,
+        chunk_size: int = 1000
+) -> AsyncIterator[bytes]:
+    columns = EXPORT_DATASETS[dataset]["columns"]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        return compressor.compress(data) if compressor else data
+
+    if fmt == "csv":
+        writer.writerow(columns)
+
+    async for partition in stream_rows(session, query, chunk_size):
+        encode(columns, partition, buffer, writer)
+        if buffer.tell() >= FLUSH_THRESHOLD:
+            chunk = drain()
+            if chunk:
+                yield chunk
+
+    chunk = drain()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
\ No newline at end of file
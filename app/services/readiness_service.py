@@ -0,0 +1,126 @@
+﻿import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import READINESS_CACHE_SECONDS, READINESS_DB_TIMEOUT, READINESS_MAX_WEBHOOK_BACKLOG
+from app.database.core.session import AsyncSessionLocal, engine
+from app.functional.main_functions import count_expired_payments, count_failed_webhooks
+from app.services.background_tasks import sweep_heartbeats
+
+logger = logging.getLogger(__name__)
+
+STALE_GRACE_SECONDS = 60
+
+
+def pool_stats(pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {"type": type(pool).__name__}
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "type": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "capacity": capacity,
+        "utilization": round(checked_out / capacity, 3) if capacity else None
+    }
+
+
+def background_task_status(now: float) -> dict:
+    tasks = {}
+    for name, heartbeat in sweep_heartbeats.items():
+        last_seen = max(heartbeat["last_started"] or 0, heartbeat["last_finished"] or 0)
+        stale_after = heartbeat["interval"] * 2 + STALE_GRACE_SECONDS
+        tasks[name] = {
+            "alive": now - last_seen <= stale_after,
+            "seconds_since_heartbeat": round(now - last_seen, 1),
+            "last_error": heartbeat["last_error"]
+        }
+    return tasks
+
+
+class ReadinessProbe:
+    """Readiness report refreshed at most once per ``ttl`` seconds.
+
+    Concurrent probes that find the report stale wait for the single refresh in
+    flight instead of starting their own, so probe frequency never turns into
+    database load.
+    """
+
+    def __init__(
+            self,
+            ttl: float = READINESS_CACHE_SECONDS,
+            db_timeout: float = READINESS_DB_TIMEOUT,
+            max_webhook_backlog: int = READINESS_MAX_WEBHOOK_BACKLOG,
+            session_factory=AsyncSessionLocal,
+            db_engine=engine
+    ):
+        self.ttl = ttl
+        self.db_timeout = db_timeout
+        self.max_webhook_backlog = max_webhook_backlog
+        self.session_factory = session_factory
+        self.engine = db_engine
+        self._report: Optional[dict] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _check_database(self) -> dict:
+        async with self.session_factory() as session:
+            started = time.perf_counter()
+            await session.execute(text("SELECT 1"))
+            latency = time.perf_counter() - started
+
+            return {
+                "ok": True,
+                "latency_ms": round(latency * 1000, 2),
+                "pending_expirations": await count_expired_payments(session),
+                "failed_webhooks": await count_failed_webhooks(session)
+            }
+
+    async def _refresh(self) -> dict:
+        try:
+            database = await asyncio.wait_for(self._check_database(), self.db_timeout)
+        except asyncio.TimeoutError:
+            database = {"ok": False, "error": f"timed out after {self.db_timeout}s"}
+        except Exception as e:
+            logger.warning(f"Readiness database check failed: {e}")
+            database = {"ok": False, "error": str(e)}
+
+        now = time.time()
+        tasks = background_task_status(now)
+
+        reasons = []
+        if not database["ok"]:
+            reasons.append("database")
+        elif self.max_webhook_backlog and database["failed_webhooks"] > self.max_webhook_backlog:
+            reasons.append("webhook_backlog")
+        reasons.extend(f"task:{name}" for name, status in tasks.items() if not status["alive"])
+
+        return {
+            "ready": not reasons,
+            "reasons": reasons,
+            "checked_at": now,
+            "database": database,
+            "pool": pool_stats(self.engine.pool),
+            "background_tasks": tasks
+        }
+
+    async def report(self) -> dict:
+        if self._report is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._report
+
+        async with self._lock:
+            if self._report is None or time.monotonic() - self._checked_at >= self.ttl:
+                self._report = await self._refresh()
+                self._checked_at = time.monotonic()
+
+        return self._report
+
+
+readiness_probe = ReadinessProbe()
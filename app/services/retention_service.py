@@ -0,0 +1,132 @@
+﻿import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.functional.main_functions import (
+    delete_webhook_logs,
+    drop_webhook_log_partition,
+    ensure_webhook_log_partition,
+    get_webhook_log_batch,
+    is_webhook_logs_partitioned,
+    list_webhook_log_partitions
+)
+from app.core.config import (
+    ARCHIVE_DIR,
+    WEBHOOK_LOG_RETENTION_DAYS,
+    RETENTION_BATCH_SIZE,
+    RETENTION_BATCH_PAUSE
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _archive_path(directory: str, label: str) -> str:
+    return os.path.join(directory, f"webhook_logs-{label}.ndjson.gz")
+
+
+def _append_archive(path: str, rows) -> None:
+    lines = "".join(
+        json.dumps({key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()})
+        + "\n"
+        for row in rows
+    )
+
+    with open(path, "ab") as f:
+        f.write(gzip.compress(lines.encode("utf-8")))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+async def _archive_and_delete(
+        session: AsyncSession,
+        cutoff: datetime,
+        archive_path: str,
+        batch_size: int,
+        pause: float,
+        max_batches: Optional[int]
+) -> int:
+    archived = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        rows = await get_webhook_log_batch(session, cutoff, 0, batch_size)
+        if not rows:
+            break
+
+        await asyncio.to_thread(_append_archive, archive_path, rows)
+        await delete_webhook_logs(session, [row["id"] for row in rows])
+
+        archived += len(rows)
+        batches += 1
+        await asyncio.sleep(pause)
+
+    return archived
+
+
+async def _archive_and_drop_partitions(
+        session: AsyncSession,
+        cutoff: datetime,
+        directory: str,
+        batch_size: int,
+        pause: float
+) -> int:
+    archived = 0
+
+    for name, month in await list_webhook_log_partitions(session):
+        if datetime.combine(_next_month(month), datetime.min.time()) > cutoff:
+            continue
+
+        archive_path = _archive_path(directory, month.strftime("%Y%m"))
+        last_id = 0
+        while True:
+            rows = await get_webhook_log_batch(session, None, last_id, batch_size, source=name)
+            if not rows:
+                break
+
+            await asyncio.to_thread(_append_archive, archive_path, rows)
+            last_id = rows[-1]["id"]
+            archived += len(rows)
+            await asyncio.sleep(pause)
+
+        await drop_webhook_log_partition(session, name)
+        logger.info(f"Archived and dropped webhook log partition {name}")
+
+    return archived
+
+
+async def apply_webhook_log_retention(
+        session: AsyncSession,
+        retention_days: int = WEBHOOK_LOG_RETENTION_DAYS,
+        directory: str = ARCHIVE_DIR,
+        batch_size: int = RETENTION_BATCH_SIZE,
+        pause: float = RETENTION_BATCH_PAUSE,
+        max_batches: Optional[int] = None
+) -> int:
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=retention_days)
+    os.makedirs(directory, exist_ok=True)
+
+    if await is_webhook_logs_partitioned(session):
+        this_month = now.date().replace(day=1)
+        for month in (this_month, _next_month(this_month)):
+            await ensure_webhook_log_partition(session, month)
+
+        archived = await _archive_and_drop_partitions(session, cutoff, directory, batch_size, pause)
+    else:
+        archive_path = _archive_path(directory, now.strftime("%Y%m%d"))
+        archived = await _archive_and_delete(session, cutoff, archive_path, batch_size, pause, max_batches)
+
+    if archived:
+        logger.info(f"Archived {archived} webhook logs older than {cutoff.isoformat()}")
+
+    return archived
\ No newline at end of file
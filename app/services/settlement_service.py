@@ -0,0 +1,187 @@
+﻿import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.functional.main_functions import get_settlement_batch
+from app.models.main_models import PaymentStatus
+from app.core.config import CURRENCY_CODE, SETTLEMENT_DIR, SETTLEMENT_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = "1"
+
+_locks: Dict[date, asyncio.Lock] = {}
+
+
+def settlement_paths(day: date, directory: str = SETTLEMENT_DIR) -> Dict[str, str]:
+    base = os.path.join(directory, f"settlement-{day.isoformat()}.psv.gz")
+    return {
+        "file": base,
+        "part": base + ".part",
+        "state": base + ".state.json",
+        "checksum": base + ".sha256",
+        "manifest": base + ".json",
+    }
+
+
+def _amount(value: float) -> int:
+    return int(round(value))
+
+
+def _new_state() -> dict:
+    return {
+        "last_id": 0,
+        "bytes_written": 0,
+        "sales_count": 0,
+        "sales_total": 0,
+        "refund_count": 0,
+        "refund_total": 0,
+    }
+
+
+def _load_state(paths: Dict[str, str]) -> dict:
+    if not os.path.exists(paths["state"]) or not os.path.exists(paths["part"]):
+        return _new_state()
+
+    with open(paths["state"], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(paths: Dict[str, str], state: dict) -> None:
+    tmp_path = paths["state"] + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, paths["state"])
+
+
+def _append_member(paths: Dict[str, str], state: dict, lines) -> None:
+    data = gzip.compress("".join(lines).encode("utf-8"))
+
+    with open(paths["part"], "r+b" if os.path.exists(paths["part"]) else "wb") as f:
+        f.truncate(state["bytes_written"])
+        f.seek(state["bytes_written"])
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    state["bytes_written"] += len(data)
+
+
+def _file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def generate_settlement_file(
+        session: AsyncSession,
+        day: date,
+        directory: str = SETTLEMENT_DIR,
+        batch_size: int = SETTLEMENT_BATCH_SIZE
+) -> dict:
+    lock = _locks.setdefault(day, asyncio.Lock())
+
+    async with lock:
+        paths = settlement_paths(day, directory)
+
+        if os.path.exists(paths["file"]):
+            return summarize_settlement(day, directory)
+
+        os.makedirs(directory, exist_ok=True)
+        state = _load_state(paths)
+        day_start = datetime.combine(day, time.min)
+        day_end = day_start + timedelta(days=1)
+
+        if state["bytes_written"] == 0:
+            logger.info(f"Generating settlement file for {day}")
+            header = f"H|{FORMAT_VERSION}|{day.isoformat()}|{CURRENCY_CODE}|{datetime.utcnow().isoformat()}\n"
+            _append_member(paths, state, [header])
+            _save_state(paths, state)
+        else:
+            logger.info(f"Resuming settlement file for {day} after operation {state['last_id']}")
+
+        while True:
+            rows = await get_settlement_batch(session, day_start, day_end, state["last_id"], batch_size)
+            if not rows:
+                break
+
+            lines = []
+            for op_id, payment_id, reference, amount, card_mask, created_at, status in rows:
+                minor = _amount(amount)
+                if status == PaymentStatus.REFUNDED:
+                    record_type = "R"
+                    state["refund_count"] += 1
+                    state["refund_total"] += minor
+                else:
+                    record_type = "D"
+                    state["sales_count"] += 1
+                    state["sales_total"] += minor
+
+                lines.append(
+                    f"{record_type}|{op_id}|{payment_id}|{reference.replace('|', ' ')}|"
+                    f"{minor}|{card_mask}|{created_at.isoformat()}\n"
+                )
+
+            state["last_id"] = rows[-1][0]
+            await asyncio.to_thread(_append_member, paths, state, lines)
+            await asyncio.to_thread(_save_state, paths, state)
+
+        trailer = (
+            f"T|{state['sales_count']}|{state['sales_total']}|"
+            f"{state['refund_count']}|{state['refund_total']}|"
+            f"{state['sales_total'] - state['refund_total']}\n"
+        )
+        _append_member(paths, state, [trailer])
+
+        checksum = await asyncio.to_thread(_file_checksum, paths["part"])
+        with open(paths["checksum"], "w", encoding="utf-8") as f:
+            f.write(f"{checksum}  {os.path.basename(paths['file'])}\n")
+
+        manifest = {
+            "date": day.isoformat(),
+            "status": "ready",
+            "file": os.path.basename(paths["file"]),
+            "sha256": checksum,
+            "sales_count": state["sales_count"],
+            "sales_total": state["sales_total"],
+            "refund_count": state["refund_count"],
+            "refund_total": state["refund_total"],
+            "net_total": state["sales_total"] - state["refund_total"],
+        }
+        with open(paths["manifest"], "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+        os.replace(paths["part"], paths["file"])
+        os.remove(paths["state"])
+
+        logger.info(
+            f"Settlement file for {day} ready: {state['sales_count']} sales, "
+            f"{state['refund_count']} refunds"
+        )
+        return manifest
+
+
+def summarize_settlement(day: date, directory: str = SETTLEMENT_DIR) -> dict:
+    paths = settlement_paths(day, directory)
+
+    if os.path.exists(paths["file"]) and os.path.exists(paths["manifest"]):
+        with open(paths["manifest"], "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    state = _load_state(paths)
+    return {
+        "date": day.isoformat(),
+        "status": "in_progress" if state["bytes_written"] else "missing",
+        "last_id": state["last_id"],
+    }
\ No newline at end of file
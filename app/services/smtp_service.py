@@ -1,5 +1,6 @@
 ﻿import os
 import logging
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pathlib import Path
@@ -7,6 +8,9 @@ from dotenv import load_dotenv
 from datetime import datetime
 import aiosmtplib
 
+from app.core.metrics import SMTP_SEND_SECONDS
+from app.core.tracing import traced
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -27,6 +31,7 @@ if not EMAIL_ENABLED:
     )
 
 
+@traced("smtp.send_email")
 async def send_email(to_email: str, subject: str, html_content: str, text_content: str):
     if not EMAIL_ENABLED:
         logger.info(
@@ -48,6 +53,7 @@ async def send_email(to_email: str, subject: str, html_content: str, text_conten
     msg.attach(part1)
     msg.attach(part2)
 
+    started = time.perf_counter()
     try:
         await aiosmtplib.send(
             msg,
@@ -58,8 +64,10 @@ async def send_email(to_email: str, subject: str, html_content: str, text_conten
             use_tls=False,
             start_tls=True
         )
+        SMTP_SEND_SECONDS.observe(time.perf_counter() - started, "success")
         logger.info(f"✅ Email sent successfully to {to_email}")
     except Exception as e:
+        SMTP_SEND_SECONDS.observe(time.perf_counter() - started, "error")
         logger.error(f"❌ Failed to send email to {to_email}: {e}", exc_info=True)
 
 
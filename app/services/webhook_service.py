@@ -3,10 +3,13 @@ import json
 import hmac
 import hashlib
 import logging
+import time
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.main_models import WebhookLog, Payment
 from app.functional.main_functions import log_webhook, update_payment
+from app.core.metrics import WEBHOOK_ATTEMPTS, WEBHOOK_SECONDS
+from app.core.tracing import traced, start_span, SPAN_KIND_CLIENT
 import os
 from dotenv import load_dotenv
 
@@ -26,6 +29,7 @@ def generate_webhook_signature(payload: dict, secret: str = WEBHOOK_SECRET) -> s
     ).hexdigest()
 
 
+@traced("webhook.send_webhook_with_retry")
 async def send_webhook_with_retry(
         payment: Payment,
         db: AsyncSession,
@@ -58,16 +62,25 @@ async def send_webhook_with_retry(
     attempt = payment.webhook_attempts + 1
 
     logger.info(f"Sending webhook to {webhook_url} for payment {payment.id}, attempt {attempt}")
+    started = time.perf_counter()
 
     try:
         async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(
-                webhook_url,
-                json=webhook_data,
-                headers=headers
-            )
+            with start_span("webhook.post", {"http.url": webhook_url}, kind=SPAN_KIND_CLIENT) as span:
+                if span.traceparent:
+                    headers["traceparent"] = span.traceparent
+
+                response = await client.post(
+                    webhook_url,
+                    json=webhook_data,
+                    headers=headers
+                )
+                span.attributes["http.status_code"] = response.status_code
 
             success = response.status_code in [200, 201, 202, 204]
+            outcome = "success" if success else "http_error"
+            WEBHOOK_ATTEMPTS.inc(outcome)
+            WEBHOOK_SECONDS.observe(time.perf_counter() - started, outcome)
 
             webhook_log = WebhookLog(
                 payment_id=payment.id,
@@ -98,6 +111,8 @@ async def send_webhook_with_retry(
 
     except httpx.TimeoutException:
         logger.error(f"Webhook timeout for payment {payment.id}")
+        WEBHOOK_ATTEMPTS.inc("timeout")
+        WEBHOOK_SECONDS.observe(time.perf_counter() - started, "timeout")
 
         webhook_log = WebhookLog(
             payment_id=payment.id,
@@ -120,6 +135,8 @@ async def send_webhook_with_retry(
 
     except Exception as e:
         logger.error(f"Webhook error for payment {payment.id}: {str(e)}")
+        WEBHOOK_ATTEMPTS.inc("error")
+        WEBHOOK_SECONDS.observe(time.perf_counter() - started, "error")
 
         webhook_log = WebhookLog(
             payment_id=payment.id,
@@ -0,0 +1,166 @@
+﻿"""
+Pytest plugin that gives every test a clean database without rebuilding the schema.
+
+Enable it from a conftest.py::
+
+    pytest_plugins = ["app.testing.pytest_plugin"]
+
+The schema is created once per run. How each test gets a fresh copy depends on
+the database in TEST_DATABASE_URL (default: in-memory SQLite):
+
+- SQLite: the empty schema is snapshotted with the SQLite backup API and copied
+  back over the live database before each test.
+- Anything else: each test runs inside an outer transaction that is rolled back
+  afterwards; commits made by the code under test become savepoints.
+
+Tests marked ``@pytest.mark.db_seed("dataset")`` start from a seeded template
+instead of an empty schema. Further templates can be added with
+:func:`register_seed`.
+"""
+import os
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import AsyncIterator, Awaitable, Callable, Dict
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+import app.models.main_models  # noqa: F401  (registers the tables on SQLModel.metadata)
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+SCHEMA = "schema"
+
+Seeder = Callable[[AsyncEngine], Awaitable[None]]
+SEEDERS: Dict[str, Seeder] = {}
+
+
+def register_seed(name: str):
+    """Register an async ``seeder(engine)`` that fills a named template."""
+    def decorator(seeder: Seeder) -> Seeder:
+        SEEDERS[name] = seeder
+        return seeder
+    return decorator
+
+
+@register_seed("dataset")
+async def _seed_dataset(engine: AsyncEngine) -> None:
+    from tools.dataset import DatasetGenerator, load_dataset
+
+    await load_dataset(engine, DatasetGenerator(200, seed=42, end=date(2025, 1, 1), customers=40), use_copy=False)
+
+
+class _NestedBind:
+    """Lets seeders written against an engine run inside the per-test transaction."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.dialect = conn.dialect
+
+    @asynccontextmanager
+    async def begin(self):
+        async with self.conn.begin_nested():
+            yield self.conn
+
+
+class DatabaseTemplate:
+    def __init__(self, url: str = TEST_DATABASE_URL):
+        self.url = url
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        self.engine = create_async_engine(url, echo=False, connect_args=connect_args)
+        self.session_factory = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.snapshots = self.engine.dialect.name == "sqlite" and ":memory:" in url
+        self._templates = {}
+        self._schema_ready = False
+
+    async def _create_schema(self) -> None:
+        async with self.engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.drop_all)
+            await conn.run_sync(SQLModel.metadata.create_all)
+        self._schema_ready = True
+
+    async def _copy(self, source=None):
+        import aiosqlite
+
+        async with self.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            live = raw.driver_connection
+
+            if source is not None:
+                await source.backup(live)
+                return live
+
+            snapshot = await aiosqlite.connect(":memory:")
+            await live.backup(snapshot)
+            return snapshot
+
+    async def _template(self, name: str):
+        if name not in self._templates:
+            if name == SCHEMA:
+                await self._create_schema()
+            else:
+                await self._copy(await self._template(SCHEMA))
+                await SEEDERS[name](self.engine)
+            self._templates[name] = await self._copy()
+        return self._templates[name]
+
+    @asynccontextmanager
+    async def session(self, template: str = SCHEMA) -> AsyncIterator[AsyncSession]:
+        if template != SCHEMA and template not in SEEDERS:
+            raise ValueError(f"Unknown db_seed template: {template}")
+
+        if self.snapshots:
+            await self._copy(await self._template(template))
+            async with self.session_factory() as session:
+                yield session
+            return
+
+        if not self._schema_ready:
+            await self._create_schema()
+
+        async with self.engine.connect() as conn:
+            transaction = await conn.begin()
+            session = AsyncSession(bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint")
+            try:
+                if template != SCHEMA:
+                    await SEEDERS[template](_NestedBind(conn))
+                yield session
+            finally:
+                await session.close()
+                await transaction.rollback()
+
+
+_template = None
+
+
+def get_template() -> DatabaseTemplate:
+    global _template
+    if _template is None:
+        _template = DatabaseTemplate()
+    return _template
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "db_seed(name): start the test from a seeded database template instead of an empty schema"
+    )
+
+
+@pytest.fixture(scope="session")
+def db_template() -> DatabaseTemplate:
+    return get_template()
+
+
+@pytest.fixture(scope="session")
+def db_engine(db_template: DatabaseTemplate) -> AsyncEngine:
+    return db_template.engine
+
+
+@pytest.fixture(scope="function")
+async def db_session(db_template: DatabaseTemplate, request) -> AsyncIterator[AsyncSession]:
+    """Session on a database reset to the schema template (or the ``db_seed`` template)."""
+    marker = request.node.get_closest_marker("db_seed")
+    async with db_template.session(marker.args[0] if marker else SCHEMA) as session:
+        yield session
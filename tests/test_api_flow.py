@@ -57,4 +57,31 @@ async def test_checkout_page_load(client: AsyncClient):
     checkout_resp = await client.get(f"/checkout/{payment_id}")
 
     assert checkout_resp.status_code == 200
-    assert "TEST-CHECKOUT-FLOW" in checkout_resp.text
\ No newline at end of file
+    assert "TEST-CHECKOUT-FLOW" in checkout_resp.text
+
+async def test_payment_timeline_records_transitions(client: AsyncClient):
+    payload = {
+        "amount": 2500,
+        "reference": "TEST-TIMELINE",
+        "webhookUrl": "https://example.com/hook",
+        "redirectUrl": "https://example.com/ok"
+    }
+    create_resp = await client.post("/api/create-invoice", json=payload)
+    payment_id = create_resp.json()["pageUrl"].split("/")[-1]
+
+    pay_resp = await client.post(
+        f"/api/pay/{payment_id}",
+        data={"card_number": "1111 2222 3333 4444", "email": "user@example.com", "csrf_token": "token"},
+        headers={"Cookie": "csrf_token=token"}
+    )
+    assert pay_resp.status_code == 402
+
+    timeline_resp = await client.get(f"/api/payments/{payment_id}/timeline")
+    assert timeline_resp.status_code == 200
+
+    data = timeline_resp.json()
+    assert data["status"] == "failed"
+    assert [(e["from_status"], e["to_status"], e["reason"]) for e in data["events"]] == [
+        (None, "pending", "invoice_created"),
+        ("pending", "failed", "INSUFFICIENT_FUNDS"),
+    ]
\ No newline at end of file
@@ -0,0 +1,43 @@
+﻿import pytest
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import select
+
+from app.models.main_models import WebhookLog
+from app.services.batch_writer import BatchWriter
+
+pytestmark = pytest.mark.asyncio
+
+
+def _log(i: int) -> WebhookLog:
+    return WebhookLog(
+        payment_id=f"pay-{i}",
+        webhook_url="https://example.com/webhook",
+        payload="{}",
+        signature="sig",
+        attempt_number=1
+    )
+
+
+async def _count(db_session: AsyncSession) -> int:
+    return (await db_session.execute(select(func.count()).select_from(WebhookLog))).scalar_one()
+
+
+async def test_batch_writer_flushes_and_drains_on_stop(db_session: AsyncSession):
+    factory = sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    writer = BatchWriter(WebhookLog, batch_size=2, flush_interval=60, session_factory=factory)
+
+    assert writer.submit(_log(0)) is False
+
+    writer.start()
+    for i in range(5):
+        assert writer.submit(_log(i))
+
+    await writer.flush()
+    assert await _count(db_session) == 5
+
+    writer.submit(_log(5))
+    await writer.stop()
+    assert await _count(db_session) == 6
+    assert not writer.running
\ No newline at end of file
@@ -0,0 +1,26 @@
+﻿from tools.benchmarks import BENCHMARKS, compare, measure
+
+
+def _report(**mins):
+    return {"results": {name: {"min_ns": value, "median_ns": value} for name, value in mins.items()}}
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = _report(to_camel=1000.0, clean_input=2000.0, to_upper=500.0)
+    current = _report(to_camel=1200.0, clean_input=1500.0, to_upper=520.0, new_one=10.0)
+
+    comparison = compare(current, baseline, threshold=0.10)
+
+    assert comparison["to_camel"]["status"] == "regression"
+    assert comparison["to_camel"]["change"] == 0.2
+    assert comparison["clean_input"]["status"] == "improvement"
+    assert comparison["to_upper"]["status"] == "unchanged"
+    assert comparison["new_one"]["status"] == "new"
+
+
+def test_measure_calibrates_loops():
+    result = measure(BENCHMARKS["to_camel"](), repeat=3, min_time=0.01, warmup=0.0)
+
+    assert result["loops"] > 1
+    assert result["repeat"] == 3
+    assert 0 < result["min_ns"] <= result["median_ns"]
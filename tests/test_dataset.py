@@ -0,0 +1,52 @@
+﻿from datetime import date
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.main_models import Payment, SavedCard, SuccessfulOperation, WebhookLog
+from tools.dataset import DatasetGenerator, load_dataset
+
+pytestmark = pytest.mark.asyncio
+
+
+def _rows(generator: DatasetGenerator):
+    return [chunk for chunk in generator.payment_chunks(chunk_size=50)]
+
+
+def test_generator_is_deterministic_by_seed():
+    first = _rows(DatasetGenerator(200, seed=7, end=date(2025, 1, 1)))
+    second = _rows(DatasetGenerator(200, seed=7, end=date(2025, 1, 1)))
+    other = _rows(DatasetGenerator(200, seed=8, end=date(2025, 1, 1)))
+
+    assert first == second
+    assert first != other
+    assert [len(chunk["payments"]) for chunk in first] == [50, 50, 50, 50]
+
+
+def test_paid_payments_have_operation_and_webhook_logs():
+    chunks = _rows(DatasetGenerator(500, seed=1, end=date(2025, 1, 1)))
+    payments = [p for chunk in chunks for p in chunk["payments"]]
+    operations = {o["payment_id"] for chunk in chunks for o in chunk["successful_operations"]}
+    logged = {log["payment_id"] for chunk in chunks for log in chunk["webhook_logs"]}
+
+    settled = {p["id"] for p in payments if p["status"] in ("paid", "refunded")}
+    assert settled == operations == logged
+    assert 0.6 < sum(p["status"] == "paid" for p in payments) / len(payments) < 0.8
+    assert all(p["created_at"] < p["expires_at"] for p in payments)
+
+
+async def test_load_dataset_inserts_all_tables(db_session: AsyncSession):
+    generator = DatasetGenerator(120, seed=3, end=date(2025, 1, 1), customers=20)
+
+    result = await load_dataset(db_session.bind, generator, chunk_size=50)
+
+    async def count(model):
+        return (await db_session.execute(select(func.count()).select_from(model))).scalar_one()
+
+    assert await count(Payment) == result["rows"]["payments"] == 120
+    assert await count(SuccessfulOperation) == result["rows"]["successful_operations"]
+    assert await count(WebhookLog) == result["rows"]["webhook_logs"]
+    assert await count(SavedCard) == result["rows"]["saved_cards"]
+    assert result["method"] == "insert"
@@ -0,0 +1,51 @@
+﻿import csv
+import gzip
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _create_invoices(client: AsyncClient, count: int):
+    for i in range(count):
+        response = await client.post("/api/create-invoice", json={
+            "amount": 1000 + i,
+            "reference": f"EXPORT-{i}",
+            "webhookUrl": "https://example.com/webhook",
+            "redirectUrl": "https://example.com/success"
+        })
+        assert response.status_code == 200
+
+
+async def test_export_payments_ndjson(client: AsyncClient):
+    await _create_invoices(client, 3)
+
+    response = await client.get("/api/export/payments", params={"format": "ndjson", "status": "pending"})
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["reference"] for row in rows] == ["EXPORT-0", "EXPORT-1", "EXPORT-2"]
+    assert "otp_code" not in rows[0]
+
+
+async def test_export_payments_csv_gzip(client: AsyncClient):
+    await _create_invoices(client, 2)
+
+    response = await client.get("/api/export/payments", params={"gzip": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert rows[0][0] == "id"
+    assert len(rows) == 3
+
+
+async def test_export_rejects_unsupported_filter(client: AsyncClient):
+    response = await client.get("/api/export/operations", params={"status": "paid"})
+    assert response.status_code == 400
+
+    response = await client.get("/api/export/unknown")
+    assert response.status_code == 404
\ No newline at end of file
@@ -0,0 +1,35 @@
+﻿import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.limiter import limiter
+from tools.loadtest import LoadRun, WebhookReceiver, database_otp_lookup, percentile
+
+pytestmark = pytest.mark.asyncio
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) is None
+
+
+async def test_load_run_completes_full_flow(client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    monkeypatch.setattr(limiter, "enabled", False)
+    factory = sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    receiver = WebhookReceiver()
+    await receiver.start()
+
+    try:
+        run = LoadRun(client, receiver, database_otp_lookup(factory), webhook_timeout=5)
+        report = await run.run(flows=3, concurrency=1)
+    finally:
+        await receiver.stop()
+
+    assert report["flows"] == {"total": 3, "completed": 3, "failed": 0}, report["errors"]
+    for step in ("create_invoice", "checkout", "pay", "otp", "success", "webhook"):
+        assert report["steps"][step]["count"] == 3
+        assert report["steps"][step]["p95_ms"] is not None
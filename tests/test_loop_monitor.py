@@ -0,0 +1,49 @@
+﻿import asyncio
+import logging
+import time
+
+import pytest
+
+from app.core.loop_monitor import BlockingCallDetector, loop_lag_monitor_task
+from app.core.metrics import LOOP_BLOCKED_TOTAL, LOOP_LAG_SECONDS
+
+pytestmark = pytest.mark.asyncio
+
+
+def _blocking_render():
+    time.sleep(0.3)
+
+
+async def test_lag_sampler_records_blocked_loop():
+    before = LOOP_LAG_SECONDS._values.get((), [[0], 0.0])[1]
+
+    task = asyncio.create_task(loop_lag_monitor_task(interval=0.01))
+    await asyncio.sleep(0.02)
+    _blocking_render()
+    await asyncio.sleep(0.02)
+    task.cancel()
+
+    assert LOOP_LAG_SECONDS._values[()][1] - before >= 0.2
+
+
+async def test_detector_logs_offending_stack(caplog):
+    before = LOOP_BLOCKED_TOTAL._values.get((), 0.0)
+    detector = BlockingCallDetector(threshold=0.05, interval=0.01)
+    detector.start()
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        await asyncio.sleep(0.05)
+        _blocking_render()
+        await asyncio.sleep(0.1)
+        detector.stop()
+
+    assert LOOP_BLOCKED_TOTAL._values[()] == before + 1
+    assert "_blocking_render" in caplog.text
+    assert not detector.running
+
+
+async def test_detector_disabled_with_zero_threshold():
+    detector = BlockingCallDetector(threshold=0)
+    detector.start()
+
+    assert not detector.running
@@ -0,0 +1,53 @@
+﻿import json
+import os
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import metrics
+from app.core.metrics import INVOICES_CREATED, OTP_VERIFY_SECONDS
+
+pytestmark = pytest.mark.asyncio
+
+
+def _sample(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+async def test_metrics_endpoint_counts_invoices(client: AsyncClient):
+    before = _sample((await client.get("/metrics")).text, "acquiremock_invoices_created_total")
+
+    await client.post("/api/create-invoice", json={
+        "amount": 100,
+        "reference": "METRICS-1",
+        "webhookUrl": "https://example.com/webhook",
+        "redirectUrl": "https://example.com/success"
+    })
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert _sample(response.text, "acquiremock_invoices_created_total") == before + 1
+    assert "# TYPE acquiremock_otp_verify_seconds histogram" in response.text
+
+
+async def test_metrics_aggregate_worker_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    OTP_VERIFY_SECONDS.observe(0.02, "success")
+    local = metrics.collect_snapshot()
+
+    other_worker = {
+        INVOICES_CREATED.name: [[[], 5.0]],
+        OTP_VERIFY_SECONDS.name: [[["success"], [[0, 0, 1] + [0] * 9, 0.02]]],
+    }
+    (tmp_path / f"metrics-{os.getppid()}.json").write_text(json.dumps(other_worker))
+
+    text = metrics.render_metrics()
+
+    local_invoices = dict((tuple(k), v) for k, v in local[INVOICES_CREATED.name]).get((), 0.0)
+    assert _sample(text, "acquiremock_invoices_created_total") == local_invoices + 5
+    local_count = sum(dict((tuple(k), v) for k, v in local[OTP_VERIFY_SECONDS.name])[("success",)][0])
+    assert _sample(text, 'acquiremock_otp_verify_seconds_count{outcome="success"}') == local_count + 1
\ No newline at end of file
@@ -0,0 +1,60 @@
+﻿import os
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.core import profiling
+from app.core.profiling import ProfilingMiddleware, profiled, request_sweep_profile, take_sweep_profile
+from app.main_test import app
+
+pytestmark = pytest.mark.asyncio
+
+INVOICE = {
+    "amount": 1500,
+    "reference": "PROFILE-ME",
+    "webhookUrl": "https://example.com/webhook",
+    "redirectUrl": "https://example.com/success"
+}
+
+
+@pytest.fixture
+async def profiling_client(client: AsyncClient, tmp_path):
+    wrapped = ProfilingMiddleware(app, secret="s3cret", directory=str(tmp_path))
+    async with AsyncClient(transport=ASGITransport(app=wrapped), base_url="http://test") as c:
+        yield c
+
+
+async def test_request_not_profiled_without_secret(profiling_client: AsyncClient, tmp_path):
+    response = await profiling_client.get("/health", headers={"X-Profile": "wrong"})
+
+    assert response.status_code == 200
+    assert "x-profile-file" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+
+async def test_profile_labelled_with_route_and_payment(profiling_client: AsyncClient, tmp_path):
+    create_resp = await profiling_client.post("/api/create-invoice", json=INVOICE)
+    payment_id = create_resp.json()["pageUrl"].split("/")[-1]
+
+    response = await profiling_client.get(f"/checkout/{payment_id}?profile=s3cret")
+
+    assert response.status_code == 200
+    filename = response.headers["x-profile-file"]
+    assert filename.endswith(f"GET-checkout_payment_id-{payment_id}.prof")
+    assert os.listdir(tmp_path) == [filename]
+
+
+async def test_overlapping_profiles_are_skipped(tmp_path):
+    async with profiled("outer", str(tmp_path)) as outer:
+        async with profiled("inner", str(tmp_path)) as inner:
+            assert inner is None
+
+    assert os.path.exists(outer.path)
+    assert not profiling._active
+
+
+async def test_sweep_profile_requested_once():
+    request_sweep_profile("webhook_retry")
+
+    assert take_sweep_profile("webhook_retry")
+    assert not take_sweep_profile("webhook_retry")
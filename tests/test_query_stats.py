@@ -0,0 +1,41 @@
+﻿import pytest
+from httpx import AsyncClient
+
+from app.database.core import query_stats
+from app.database.core.query_stats import assert_max_queries, count_queries
+
+pytestmark = pytest.mark.asyncio
+
+INVOICE = {
+    "amount": 1500,
+    "reference": "QUERY-BUDGET",
+    "webhookUrl": "https://example.com/webhook",
+    "redirectUrl": "https://example.com/success"
+}
+
+
+async def test_create_invoice_query_budget(client: AsyncClient):
+    with assert_max_queries(3) as stats:
+        response = await client.post("/api/create-invoice", json=INVOICE)
+
+    assert response.status_code == 200
+    assert stats.count >= 1
+
+
+async def test_query_budget_failure_lists_statements(client: AsyncClient):
+    with pytest.raises(AssertionError, match="Expected at most 0 queries"):
+        with assert_max_queries(0):
+            await client.post("/api/create-invoice", json=INVOICE)
+
+
+async def test_debug_mode_exposes_query_headers(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(query_stats, "DEBUG", True)
+
+    create_resp = await client.post("/api/create-invoice", json=INVOICE)
+    payment_id = create_resp.json()["pageUrl"].split("/")[-1]
+
+    with count_queries() as stats:
+        response = await client.get(f"/checkout/{payment_id}")
+
+    assert int(response.headers["x-db-queries"]) == stats.count
+    assert "x-db-time-ms" in response.headers
\ No newline at end of file
@@ -0,0 +1,80 @@
+﻿import time
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import health
+from app.database.core.query_stats import count_queries
+from app.models.main_models import Payment
+from app.services import background_tasks
+from app.services.readiness_service import ReadinessProbe
+
+pytestmark = pytest.mark.asyncio
+
+
+def _payment(i: int, **fields) -> Payment:
+    return Payment(
+        id=f"ready-{i}",
+        amount=100,
+        reference=f"READY-{i}",
+        webhook_url="https://example.com/webhook",
+        redirect_url="https://example.com/success",
+        **fields
+    )
+
+
+@pytest.fixture
+def probe(db_session: AsyncSession, monkeypatch) -> ReadinessProbe:
+    factory = sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    probe = ReadinessProbe(ttl=60, max_webhook_backlog=1, session_factory=factory, db_engine=db_session.bind)
+    monkeypatch.setattr(health, "readiness_probe", probe)
+    return probe
+
+
+async def test_ready_reports_backlog_and_caches(client: AsyncClient, db_session: AsyncSession, probe):
+    db_session.add(_payment(1, expires_at=datetime.utcnow() - timedelta(minutes=1)))
+    db_session.add(_payment(2, status="paid", webhook_status="failed"))
+    await db_session.commit()
+
+    response = await client.get("/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ready"] is True
+    assert body["database"]["pending_expirations"] == 1
+    assert body["database"]["failed_webhooks"] == 1
+    assert "pool" in body
+
+    with count_queries() as stats:
+        cached = await client.get("/ready")
+
+    assert stats.count == 0
+    assert cached.json()["checked_at"] == body["checked_at"]
+
+
+async def test_not_ready_when_backlog_exceeds_limit(client: AsyncClient, db_session: AsyncSession, probe):
+    for i in range(2):
+        db_session.add(_payment(i, status="paid", webhook_status="failed"))
+    await db_session.commit()
+
+    response = await client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["reasons"] == ["webhook_backlog"]
+
+
+async def test_not_ready_when_background_task_stalls(client: AsyncClient, probe, monkeypatch):
+    monkeypatch.setitem(background_tasks.sweep_heartbeats, "payment_expiration", {
+        "interval": 60,
+        "last_started": time.time() - 3600,
+        "last_finished": time.time() - 3600,
+        "last_error": None
+    })
+
+    response = await client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["background_tasks"]["payment_expiration"]["alive"] is False
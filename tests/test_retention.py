@@ -0,0 +1,46 @@
+﻿import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.main_models import WebhookLog
+from app.services.retention_service import apply_webhook_log_retention
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_retention_archives_and_deletes_old_logs(db_session: AsyncSession, tmp_path):
+    now = datetime.utcnow()
+    for i in range(5):
+        db_session.add(WebhookLog(
+            payment_id=f"old-{i}",
+            webhook_url="https://example.com/webhook",
+            payload="{}",
+            signature="sig",
+            attempt_number=1,
+            created_at=now - timedelta(days=60)
+        ))
+    db_session.add(WebhookLog(
+        payment_id="recent",
+        webhook_url="https://example.com/webhook",
+        payload="{}",
+        signature="sig",
+        attempt_number=1,
+        created_at=now
+    ))
+    await db_session.commit()
+
+    archived = await apply_webhook_log_retention(
+        db_session, retention_days=30, directory=str(tmp_path), batch_size=2, pause=0
+    )
+
+    assert archived == 5
+    remaining = (await db_session.execute(select(WebhookLog.payment_id))).scalars().all()
+    assert remaining == ["recent"]
+
+    archive = next(tmp_path.glob("webhook_logs-*.ndjson.gz"))
+    rows = [json.loads(line) for line in gzip.decompress(archive.read_bytes()).decode().splitlines()]
+    assert sorted(row["payment_id"] for row in rows) == [f"old-{i}" for i in range(5)]
\ No newline at end of file
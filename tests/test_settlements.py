@@ -0,0 +1,82 @@
+﻿import gzip
+import hashlib
+from datetime import datetime, date
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.main_models import Payment, SuccessfulOperation
+from app.services import settlement_service
+from app.services.settlement_service import generate_settlement_file, settlement_paths
+
+pytestmark = pytest.mark.asyncio
+
+DAY = date(2025, 1, 15)
+
+
+async def _seed_operations(db_session: AsyncSession):
+    for i, status in enumerate(["paid", "paid", "refunded", "paid"]):
+        payment_id = f"settle-{i}"
+        db_session.add(Payment(
+            id=payment_id,
+            amount=1000 * (i + 1),
+            reference=f"ORDER-{i}",
+            webhook_url="https://example.com/webhook",
+            redirect_url="https://example.com/success",
+            status=status
+        ))
+        db_session.add(SuccessfulOperation(
+            payment_id=payment_id,
+            email="user@example.com",
+            amount=1000 * (i + 1),
+            reference=f"ORDER-{i}",
+            card_mask="**** 4444",
+            redirect_url="https://example.com/success",
+            created_at=datetime(2025, 1, 15, 10, i)
+        ))
+    await db_session.commit()
+
+
+async def test_settlement_file_totals_and_checksum(db_session: AsyncSession, tmp_path):
+    await _seed_operations(db_session)
+
+    summary = await generate_settlement_file(db_session, DAY, directory=str(tmp_path), batch_size=2)
+
+    assert summary["sales_count"] == 3
+    assert summary["sales_total"] == 1000 + 2000 + 4000
+    assert summary["refund_count"] == 1
+    assert summary["refund_total"] == 3000
+
+    path = settlement_paths(DAY, str(tmp_path))["file"]
+    with open(path, "rb") as f:
+        assert hashlib.sha256(f.read()).hexdigest() == summary["sha256"]
+
+    lines = gzip.decompress(open(path, "rb").read()).decode().splitlines()
+    assert lines[0].startswith("H|")
+    assert [line[0] for line in lines[1:-1]] == ["D", "D", "R", "D"]
+    assert lines[-1] == "T|3|7000|1|3000|4000"
+
+
+async def test_settlement_generation_resumes_from_cursor(db_session: AsyncSession, tmp_path, monkeypatch):
+    await _seed_operations(db_session)
+
+    original = settlement_service.get_settlement_batch
+    calls = {"count": 0}
+
+    async def interrupted(*args, **kwargs):
+        calls["count"] += 1
+        if calls["count"] == 2:
+            raise RuntimeError("connection lost")
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(settlement_service, "get_settlement_batch", interrupted)
+    with pytest.raises(RuntimeError):
+        await generate_settlement_file(db_session, DAY, directory=str(tmp_path), batch_size=2)
+
+    monkeypatch.setattr(settlement_service, "get_settlement_batch", original)
+    summary = await generate_settlement_file(db_session, DAY, directory=str(tmp_path), batch_size=2)
+
+    assert summary["sales_count"] + summary["refund_count"] == 4
+    path = settlement_paths(DAY, str(tmp_path))["file"]
+    lines = gzip.decompress(open(path, "rb").read()).decode().splitlines()
+    assert len(lines) == 6
\ No newline at end of file
@@ -0,0 +1,50 @@
+﻿import pytest
+from httpx import AsyncClient
+
+from app.core import tracing
+from app.core.tracing import parse_traceparent, root_span, start_span, traced
+
+pytestmark = pytest.mark.asyncio
+
+
+@traced("test.work")
+async def _work():
+    with start_span("test.inner"):
+        return tracing.current_span()
+
+
+async def test_sampled_trace_records_nested_spans(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    tracing._drain()
+
+    with root_span("root") as root:
+        await _work()
+
+    spans = {span.name: span for span in tracing._drain()}
+    assert set(spans) == {"root", "test.work", "test.inner"}
+    assert spans["test.work"].parent_id == root.span_id
+    assert spans["test.inner"].parent_id == spans["test.work"].span_id
+    assert {span.trace_id for span in spans.values()} == {root.trace_id}
+
+
+async def test_unsampled_trace_still_propagates_traceparent(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+    tracing._drain()
+    incoming = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+    with root_span("root", incoming):
+        assert await _work() is not None
+        with start_span("webhook.post", kind=tracing.SPAN_KIND_CLIENT) as span:
+            trace_id, parent_id, sampled = parse_traceparent(span.traceparent)
+
+    assert trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert not sampled
+    assert tracing._drain() == []
+
+
+async def test_tracing_middleware_accepts_traceparent(client: AsyncClient):
+    response = await client.get(
+        "/health",
+        headers={"traceparent": "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"}
+    )
+    assert response.status_code == 200
\ No newline at end of file
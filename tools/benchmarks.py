@@ -0,0 +1,234 @@
+﻿"""
+Microbenchmarks for the pure functions on the request path.
+
+    python -m tools.benchmarks                     # run and print JSON
+    python -m tools.benchmarks --save-baseline     # store results as the baseline
+    python -m tools.benchmarks --compare           # flag regressions against the baseline
+
+Each benchmark is warmed up, calibrated so one timing round lasts at least
+--min-time seconds, then timed for --repeat rounds with the garbage collector
+disabled. Comparisons use the fastest round, which is the least affected
+by scheduler and frequency noise.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_BASELINE = os.path.join(".benchmarks", "baseline.json")
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Register a factory that does the setup and returns the zero-argument callable to time."""
+    def decorator(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return decorator
+
+
+@benchmark("clean_input")
+def _clean_input():
+    from app.security.sanitizer import clean_input
+
+    text = "  ORDER-2025-<b>12345</b> javascript:alert(1) & more  "
+    return lambda: clean_input(text)
+
+
+@benchmark("generate_webhook_signature")
+def _webhook_signature():
+    from app.services.webhook_service import generate_webhook_signature
+
+    payload = {
+        "payment_id": "3f6c2b1e-8a4d-4e2f-9b7a-1c2d3e4f5a6b",
+        "reference": "ORDER-12345",
+        "amount": 10000,
+        "status": "paid",
+        "timestamp": "2025-01-15T10:30:00.000000",
+        "card_mask": "**** 4444"
+    }
+    return lambda: generate_webhook_signature(payload)
+
+
+@benchmark("to_camel")
+def _to_camel():
+    from app.models.invoice import to_camel
+
+    return lambda: to_camel("webhook_url")
+
+
+@benchmark("generate_secure_otp")
+def _generate_secure_otp():
+    from app.security.crypto import generate_secure_otp
+
+    return generate_secure_otp
+
+
+@benchmark("create_invoice_request_validation")
+def _create_invoice_request():
+    from app.models.invoice import CreateInvoiceRequest
+
+    data = {
+        "amount": 10000,
+        "reference": "ORDER-12345",
+        "webhookUrl": "https://merchant.example.com/webhook",
+        "redirectUrl": "https://merchant.example.com/success"
+    }
+    return lambda: CreateInvoiceRequest.model_validate(data)
+
+
+@benchmark("saved_card_verify")
+def _saved_card_verify():
+    from app.security.crypto import hash_sensitive_data, verify_sensitive_data
+
+    card_hash = hash_sensitive_data("4444444444444444")
+    return lambda: verify_sensitive_data("4444444444444444", card_hash)
+
+
+def _time_loops(fn: Callable[[], object], loops: int) -> float:
+    iterations = range(loops)
+    started = time.perf_counter()
+    for _ in iterations:
+        fn()
+    return time.perf_counter() - started
+
+
+def measure(fn: Callable[[], object], repeat: int = 7, min_time: float = 0.2, warmup: float = 0.1) -> dict:
+    deadline = time.perf_counter() + warmup
+    while time.perf_counter() < deadline:
+        fn()
+
+    loops = 1
+    while True:
+        elapsed = _time_loops(fn, loops)
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        timings = [_time_loops(fn, loops) / loops for _ in range(repeat)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        "loops": loops,
+        "repeat": repeat,
+        "min_ns": round(min(timings) * 1e9, 1),
+        "median_ns": round(statistics.median(timings) * 1e9, 1),
+        "stdev_ns": round(statistics.stdev(timings) * 1e9, 1) if repeat > 1 else 0.0
+    }
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = 7, min_time: float = 0.2, warmup: float = 0.1) -> dict:
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        results[name] = measure(factory(), repeat, min_time, warmup)
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.10) -> dict:
+    comparison = {}
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            comparison[name] = {"status": "new"}
+            continue
+
+        change = result["min_ns"] / previous["min_ns"] - 1 if previous["min_ns"] else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+
+        comparison[name] = {
+            "status": status,
+            "baseline_min_ns": previous["min_ns"],
+            "min_ns": result["min_ns"],
+            "change": round(change, 4)
+        }
+    return comparison
+
+
+def _write_json(path: str, data: dict) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run microbenchmarks for hot request-path functions")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=7, help="Timing rounds per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing round")
+    parser.add_argument("--warmup", type=float, default=0.1, help="Warmup seconds per benchmark")
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline and flag regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown counted as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        sys.stderr.write(f"Unknown benchmarks: {', '.join(unknown)}\n")
+        return 2
+
+    report = run_benchmarks(args.names, args.repeat, args.min_time, args.warmup)
+    regressions = []
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            sys.stderr.write(f"No baseline at {args.baseline}, run with --save-baseline first\n")
+            return 2
+
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        report["comparison"] = compare(report, baseline, args.threshold)
+        report["threshold"] = args.threshold
+        regressions = [name for name, item in report["comparison"].items() if item["status"] == "regression"]
+
+    if args.save_baseline:
+        _write_json(args.baseline, report)
+
+    if args.output:
+        _write_json(args.output, report)
+    else:
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+
+    if regressions:
+        sys.stderr.write(f"Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}\n")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    sys.exit(main())
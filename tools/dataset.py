@@ -0,0 +1,289 @@
+﻿"""
+Synthetic dataset generator for scale testing.
+
+Bulk-loads payments with realistic status mixes, plus the successful operations,
+saved cards and webhook logs that go with them. Output is fully determined by
+--seed and --end, so two runs with the same arguments produce identical rows.
+
+    DATABASE_URL=sqlite+aiosqlite:///./scale.db python -m tools.dataset --payments 1000000
+    DATABASE_URL=postgresql+asyncpg://... python -m tools.dataset --payments 5000000 --seed 7
+
+On PostgreSQL rows are streamed with COPY; elsewhere they are sent as multi-row
+INSERTs in chunks of --chunk-size.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import insert
+
+STATUS_WEIGHTS = (
+    ("paid", 0.70),
+    ("expired", 0.12),
+    ("failed", 0.09),
+    ("refunded", 0.03),
+    ("pending", 0.04),
+    ("waiting_for_otp", 0.02),
+)
+WEBHOOK_FAILURE_RATE = 0.08
+SAVED_CARD_RATE = 0.3
+DECLINE_CODES = ("INSUFFICIENT_FUNDS", "CARD_DECLINED", "DO_NOT_HONOR")
+CARD_MASKS = ("**** 4444", "**** 1111", "**** 4242", "**** 0005", "**** 5100")
+
+TABLE_ORDER = ("payments", "successful_operations", "webhook_logs")
+
+
+class DatasetGenerator:
+    def __init__(
+            self,
+            payments: int,
+            seed: int = 42,
+            days: int = 90,
+            end: Optional[date] = None,
+            customers: Optional[int] = None,
+            webhook_host: str = "https://merchant.example.com"
+    ):
+        self.payments = payments
+        self.seed = seed
+        self.end = datetime.combine(end or date.today(), datetime.min.time())
+        self.start = self.end - timedelta(days=days)
+        self.span_seconds = days * 86400
+        self.customers = customers or max(1, payments // 5)
+        self.webhook_host = webhook_host
+
+        self._statuses = [status for status, _ in STATUS_WEIGHTS]
+        self._weights = [weight for _, weight in STATUS_WEIGHTS]
+
+    def _uuid(self, rng: random.Random) -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def _email(self, rng: random.Random) -> str:
+        # Skewed towards low indexes so a few customers have many payments, like real traffic.
+        return f"customer-{int(self.customers * rng.random() ** 3)}@example.com"
+
+    def payment_chunks(self, chunk_size: int = 5000) -> Iterator[Dict[str, List[dict]]]:
+        from app.services.webhook_service import generate_webhook_signature
+
+        rng = random.Random(self.seed)
+        chunk = {table: [] for table in TABLE_ORDER}
+
+        for index in range(self.payments):
+            offset = self.span_seconds * (index + rng.random()) / self.payments
+            created_at = self.start + timedelta(seconds=offset)
+            status = rng.choices(self._statuses, self._weights)[0]
+            payment_id = self._uuid(rng)
+            reference = f"ORDER-{self.seed}-{index:09d}"
+            amount = float(rng.choice((499, 999, 1999, 4999)) if rng.random() < 0.4 else rng.randint(100, 500000))
+            webhook_url = f"{self.webhook_host}/webhooks/{index % 50}"
+            email = self._email(rng) if status != "pending" else None
+            card_mask = rng.choice(CARD_MASKS) if email else None
+
+            payment = {
+                "id": payment_id,
+                "amount": amount,
+                "reference": reference,
+                "webhook_url": webhook_url,
+                "redirect_url": "https://merchant.example.com/success",
+                "status": status,
+                "otp_email": email,
+                "otp_code": f"{rng.randrange(10000):04d}" if status == "waiting_for_otp" else None,
+                "card_mask": card_mask,
+                "idempotency_key": None,
+                "psp_transaction_id": None,
+                "error_code": rng.choice(DECLINE_CODES) if status == "failed" else None,
+                "error_message": "Invalid card or insufficient funds" if status == "failed" else None,
+                "webhook_attempts": 0,
+                "webhook_last_attempt": None,
+                "webhook_status": None,
+                "created_at": created_at,
+                "updated_at": created_at + timedelta(seconds=rng.randint(5, 600)),
+                "expires_at": created_at + timedelta(minutes=15),
+                "paid_at": None,
+            }
+
+            if status in ("paid", "refunded"):
+                paid_at = created_at + timedelta(seconds=rng.randint(20, 600))
+                payment["paid_at"] = paid_at
+                payment["psp_transaction_id"] = f"psp_{rng.getrandbits(48):012x}"
+
+                chunk["successful_operations"].append({
+                    "payment_id": payment_id,
+                    "email": email,
+                    "amount": amount,
+                    "reference": reference,
+                    "card_mask": card_mask,
+                    "redirect_url": payment["redirect_url"],
+                    "created_at": paid_at,
+                })
+
+                attempts = rng.randint(2, 5) if rng.random() < WEBHOOK_FAILURE_RATE else 1
+                delivered = attempts == 1 or rng.random() < 0.5
+                webhook_data = {
+                    "payment_id": payment_id,
+                    "reference": reference,
+                    "amount": amount,
+                    "status": "paid",
+                    "timestamp": paid_at.isoformat(),
+                    "card_mask": card_mask
+                }
+                payload = json.dumps(webhook_data)
+                signature = generate_webhook_signature(webhook_data)
+                attempt_at = paid_at
+
+                for attempt in range(1, attempts + 1):
+                    success = delivered and attempt == attempts
+                    chunk["webhook_logs"].append({
+                        "payment_id": payment_id,
+                        "webhook_url": webhook_url,
+                        "payload": payload,
+                        "response_status": 200 if success else rng.choice((500, 502, 503, None)),
+                        "response_body": "OK" if success else None,
+                        "signature": signature,
+                        "attempt_number": attempt,
+                        "success": success,
+                        "error_message": None if success else "Webhook delivery failed",
+                        "created_at": attempt_at,
+                    })
+                    attempt_at += timedelta(seconds=2 ** attempt)
+
+                payment["webhook_attempts"] = attempts
+                payment["webhook_last_attempt"] = attempt_at
+                payment["webhook_status"] = "success" if delivered else "failed"
+
+            chunk["payments"].append(payment)
+
+            if len(chunk["payments"]) >= chunk_size:
+                yield chunk
+                chunk = {table: [] for table in TABLE_ORDER}
+
+        if chunk["payments"]:
+            yield chunk
+
+    def saved_cards(self, card_hash: str, cvv_hash: str) -> Iterator[dict]:
+        rng = random.Random(self.seed + 1)
+
+        for index in range(self.customers):
+            if rng.random() >= SAVED_CARD_RATE:
+                continue
+            yield {
+                "email": f"customer-{index}@example.com",
+                "card_token": self._uuid(rng),
+                "card_hash": card_hash,
+                "cvv_hash": cvv_hash,
+                "expiry": f"{rng.randint(1, 12):02d}/{rng.randint(26, 31)}",
+                "card_mask": rng.choice(CARD_MASKS),
+                "psp_provider": "mock",
+                "created_at": self.start + timedelta(seconds=rng.randrange(self.span_seconds)),
+            }
+
+
+async def insert_rows(conn, table, rows: List[dict], use_copy: bool) -> None:
+    if not rows:
+        return
+
+    if use_copy:
+        columns = list(rows[0].keys())
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            records=[tuple(row[column] for column in columns) for row in rows],
+            columns=columns
+        )
+    else:
+        await conn.execute(insert(table), rows)
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def load_dataset(engine, generator: DatasetGenerator, chunk_size: int = 5000, use_copy: Optional[bool] = None) -> dict:
+    from app.models.main_models import Payment, SavedCard, SuccessfulOperation, WebhookLog
+    from app.security.crypto import hash_sensitive_data
+
+    tables = {
+        "payments": Payment.__table__,
+        "successful_operations": SuccessfulOperation.__table__,
+        "webhook_logs": WebhookLog.__table__,
+        "saved_cards": SavedCard.__table__,
+    }
+    if use_copy is None:
+        use_copy = engine.dialect.name == "postgresql"
+
+    counts = {name: 0 for name in tables}
+    started = time.perf_counter()
+
+    for chunk in generator.payment_chunks(chunk_size):
+        async with engine.begin() as conn:
+            for name in TABLE_ORDER:
+                await insert_rows(conn, tables[name], chunk[name], use_copy)
+                counts[name] += len(chunk[name])
+
+    # Every saved card shares one bcrypt hash: hashing millions of rows would take hours,
+    # and the mock only ever verifies the test card number against it.
+    card_hash = hash_sensitive_data("4444444444444444")
+    cvv_hash = hash_sensitive_data("123")
+    for batch in _chunks(generator.saved_cards(card_hash, cvv_hash), chunk_size):
+        async with engine.begin() as conn:
+            await insert_rows(conn, tables["saved_cards"], batch, use_copy)
+        counts["saved_cards"] += len(batch)
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    return {
+        "seed": generator.seed,
+        "method": "copy" if use_copy else "insert",
+        "rows": counts,
+        "total_rows": total,
+        "duration_s": round(elapsed, 2),
+        "rows_per_s": round(total / elapsed) if elapsed else None
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load a deterministic synthetic dataset")
+    parser.add_argument("--payments", type=int, default=100000, help="Number of payments to generate")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--days", type=int, default=90, help="Spread payments over this many days")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day of the range, YYYY-MM-DD (default: today)")
+    parser.add_argument("--customers", type=int, help="Distinct customer emails (default: payments / 5)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Payments per transaction")
+    parser.add_argument("--no-copy", action="store_true", help="Use multi-row INSERT on PostgreSQL too")
+    return parser.parse_args(argv)
+
+
+async def main(args) -> dict:
+    from app.database.core.session import engine
+    from app.functional.main_functions import init_db
+
+    await init_db(engine)
+    generator = DatasetGenerator(args.payments, args.seed, args.days, args.end, args.customers)
+    try:
+        return await load_dataset(engine, generator, args.chunk_size, False if args.no_copy else None)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if not os.getenv("DATABASE_URL"):
+        sys.exit("DATABASE_URL must point at the database to fill")
+
+    result = asyncio.run(main(parse_args()))
+    sys.stdout.write(json.dumps(result, indent=2) + "\n")
@@ -0,0 +1,365 @@
+﻿"""
+End-to-end load harness for the payment flow.
+
+Each simulated customer runs create-invoice -> checkout -> pay -> OTP verify ->
+success page, then waits for the merchant webhook to arrive at a local receiver.
+Latency is recorded per step and summarised as JSON.
+
+    python -m tools.loadtest --flows 500 --concurrency 50
+    python -m tools.loadtest --url http://localhost:8000 --rate 20 --duration 60
+
+In-process runs use DATABASE_URL (default: a local SQLite file) and disable the
+rate limiter. Against a URL, the harness reads OTP codes from the database in
+DATABASE_URL, so point it at the target's database.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+STEPS = ("create_invoice", "checkout", "pay", "otp", "success", "webhook")
+TEST_CARD = "4444 4444 4444 4444"
+
+OtpLookup = Callable[[str], Awaitable[Optional[str]]]
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def _cookie(response: httpx.Response, name: str) -> Optional[str]:
+    for header in response.headers.get_list("set-cookie"):
+        match = re.match(rf"\s*{name}=([^;]*)", header)
+        if match:
+            return match.group(1)
+    return None
+
+
+class StepFailed(Exception):
+    def __init__(self, step: str, reason: str):
+        super().__init__(f"{step}: {reason}")
+        self.step = step
+        self.reason = reason
+
+
+class WebhookReceiver:
+    """Minimal HTTP server that records when each payment's webhook arrives."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, public_host: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.public_host = public_host or host
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._waiters: Dict[str, asyncio.Future] = {}
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.public_host}:{self.port}/webhook"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def expect(self, payment_id: str) -> asyncio.Future:
+        future = self._waiters.get(payment_id)
+        if future is None:
+            future = self._waiters[payment_id] = asyncio.get_running_loop().create_future()
+        return future
+
+    def forget(self, payment_id: str) -> None:
+        self._waiters.pop(payment_id, None)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        received_at = time.perf_counter()
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            headers = {}
+            for line in head.decode("latin-1").split("\r\n")[1:]:
+                if ":" in line:
+                    key, value = line.split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            if length:
+                await reader.readexactly(length)
+
+            payment_id = headers.get("x-payment-id")
+            if payment_id:
+                future = self.expect(payment_id)
+                if not future.done():
+                    future.set_result(received_at)
+
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+class LoadRun:
+    def __init__(
+            self,
+            client: httpx.AsyncClient,
+            receiver: WebhookReceiver,
+            otp_lookup: OtpLookup,
+            webhook_timeout: float = 10.0
+    ):
+        self.client = client
+        self.receiver = receiver
+        self.otp_lookup = otp_lookup
+        self.webhook_timeout = webhook_timeout
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.completed = 0
+        self.failed = 0
+
+    async def _timed(self, step: str, request: Awaitable[httpx.Response], expected: int) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError as e:
+            raise StepFailed(step, type(e).__name__)
+
+        self.latencies[step].append(time.perf_counter() - started)
+        if response.status_code != expected:
+            raise StepFailed(step, f"HTTP {response.status_code}")
+        return response
+
+    async def flow(self, index: int) -> None:
+        email = f"load-{index}-{random.getrandbits(32):08x}@example.com"
+        payment_id = None
+
+        try:
+            created = await self._timed("create_invoice", self.client.post("/api/create-invoice", json={
+                "amount": random.randint(100, 100000),
+                "reference": f"LOAD-{index}",
+                "webhookUrl": self.receiver.url,
+                "redirectUrl": "https://example.com/success"
+            }), 200)
+            payment_id = created.json()["pageUrl"].rsplit("/", 1)[-1]
+            webhook_arrival = self.receiver.expect(payment_id)
+
+            checkout = await self._timed("checkout", self.client.get(f"/checkout/{payment_id}"), 200)
+            csrf_token = _cookie(checkout, "csrf_token")
+            if not csrf_token:
+                raise StepFailed("checkout", "missing csrf cookie")
+
+            await self._timed("pay", self.client.post(
+                f"/api/pay/{payment_id}",
+                data={"card_number": TEST_CARD, "email": email, "csrf_token": csrf_token},
+                headers={"Cookie": f"csrf_token={csrf_token}"}
+            ), 303)
+
+            otp_code = await self.otp_lookup(payment_id)
+            if not otp_code:
+                raise StepFailed("otp", "code not found")
+
+            otp_started = time.perf_counter()
+            await self._timed("otp", self.client.post(
+                f"/otp/verify/{payment_id}",
+                data={"otp_code": otp_code},
+                headers={"Cookie": f"csrf_token={csrf_token}"}
+            ), 303)
+
+            await self._timed("success", self.client.get(f"/success/{payment_id}"), 200)
+
+            try:
+                received_at = await asyncio.wait_for(asyncio.shield(webhook_arrival), self.webhook_timeout)
+            except asyncio.TimeoutError:
+                raise StepFailed("webhook", "timeout")
+            self.latencies["webhook"].append(max(0.0, received_at - otp_started))
+
+        except StepFailed as e:
+            self.failed += 1
+            self.errors[e.step][e.reason] += 1
+            return
+        except Exception as e:
+            self.failed += 1
+            self.errors["flow"][type(e).__name__] += 1
+            return
+        finally:
+            if payment_id:
+                self.receiver.forget(payment_id)
+
+        self.completed += 1
+
+    async def run(
+            self,
+            flows: Optional[int] = None,
+            concurrency: int = 10,
+            rate: Optional[float] = None,
+            duration: Optional[float] = None
+    ) -> dict:
+        started = time.perf_counter()
+        deadline = started + duration if duration else None
+        indexes = itertools.count()
+
+        def next_index() -> Optional[int]:
+            index = next(indexes)
+            if flows is not None and index >= flows:
+                return None
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            return index
+
+        if rate:
+            semaphore = asyncio.Semaphore(concurrency)
+            tasks = []
+
+            async def guarded(index: int):
+                async with semaphore:
+                    await self.flow(index)
+
+            index = next_index()
+            while index is not None:
+                tasks.append(asyncio.create_task(guarded(index)))
+                await asyncio.sleep(random.expovariate(rate))
+                index = next_index()
+
+            await asyncio.gather(*tasks)
+        else:
+            async def worker():
+                index = next_index()
+                while index is not None:
+                    await self.flow(index)
+                    index = next_index()
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        return self.report(time.perf_counter() - started, concurrency, rate)
+
+    def report(self, elapsed: float, concurrency: int, rate: Optional[float]) -> dict:
+        steps = {}
+        for step in STEPS:
+            values = sorted(self.latencies.get(step, []))
+            errors = sum(self.errors.get(step, Counter()).values())
+            attempts = len(values) + errors
+            steps[step] = {
+                "count": len(values),
+                "errors": errors,
+                "error_rate": round(errors / attempts, 4) if attempts else 0.0,
+                "p50_ms": _ms(percentile(values, 50)),
+                "p95_ms": _ms(percentile(values, 95)),
+                "p99_ms": _ms(percentile(values, 99)),
+                "max_ms": _ms(values[-1] if values else None)
+            }
+
+        total = self.completed + self.failed
+        return {
+            "config": {"concurrency": concurrency, "rate": rate},
+            "duration_s": round(elapsed, 3),
+            "flows": {"total": total, "completed": self.completed, "failed": self.failed},
+            "throughput_flows_per_s": round(self.completed / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(self.failed / total, 4) if total else 0.0,
+            "steps": steps,
+            "errors": {step: dict(reasons) for step, reasons in self.errors.items()}
+        }
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 2) if value is not None else None
+
+
+def database_otp_lookup(session_factory) -> OtpLookup:
+    from app.functional.main_functions import get_payment
+
+    async def lookup(payment_id: str) -> Optional[str]:
+        async with session_factory() as session:
+            payment = await get_payment(session, payment_id)
+            return payment.otp_code if payment else None
+
+    return lookup
+
+
+async def main(args) -> dict:
+    if not args.url:
+        os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./loadtest.db")
+        os.environ["TESTING"] = "true"
+
+    from app.database.core.session import AsyncSessionLocal
+
+    receiver = WebhookReceiver(args.webhook_host, args.webhook_port, args.webhook_public_host)
+    await receiver.start()
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    # Flows pass their cookies explicitly; a shared jar would leak them between customers.
+    no_cookies = CookieJar(DefaultCookiePolicy(allowed_domains=[]))
+
+    try:
+        if args.url:
+            async with httpx.AsyncClient(
+                    base_url=args.url, timeout=args.timeout, limits=limits, cookies=no_cookies
+            ) as client:
+                run = LoadRun(client, receiver, database_otp_lookup(AsyncSessionLocal), args.webhook_timeout)
+                return await run.run(args.flows, args.concurrency, args.rate, args.duration)
+
+        from app.main import app
+        from app.core.limiter import limiter
+
+        limiter.enabled = False
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                    transport=transport, base_url="http://loadtest", timeout=args.timeout, cookies=no_cookies
+            ) as client:
+                run = LoadRun(client, receiver, database_otp_lookup(AsyncSessionLocal), args.webhook_timeout)
+                return await run.run(args.flows, args.concurrency, args.rate, args.duration)
+    finally:
+        await receiver.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the full payment flow under load and report latency percentiles")
+    parser.add_argument("--url", help="Base URL of a running instance (default: run the app in-process)")
+    parser.add_argument("--flows", type=int, help="Number of payment flows to run (default: 100 unless --duration)")
+    parser.add_argument("--duration", type=float, help="Stop starting new flows after this many seconds")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum flows in flight")
+    parser.add_argument("--rate", type=float, help="Open-model arrival rate in flows/s (default: closed loop)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--webhook-timeout", type=float, default=10.0, help="Seconds to wait for each webhook")
+    parser.add_argument("--webhook-host", default="127.0.0.1", help="Interface the webhook receiver binds to")
+    parser.add_argument("--webhook-port", type=int, default=0, help="Webhook receiver port (default: random)")
+    parser.add_argument("--webhook-public-host", help="Host the target should use to reach the receiver")
+    parser.add_argument("--seed", type=int, help="Random seed for amounts and arrivals")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.flows is None and args.duration is None:
+        args.flows = 100
+    return args
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    if arguments.seed is not None:
+        random.seed(arguments.seed)
+
+    result = asyncio.run(main(arguments))
+    output = json.dumps(result, indent=2)
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+    sys.exit(1 if result["flows"]["failed"] else 0)